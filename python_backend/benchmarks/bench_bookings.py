@@ -0,0 +1,90 @@
+"""Open-loop /book load test: fixed arrival rate, latency percentiles, no double-booking.
+
+Registers a pool of users, then fires bookings at --rate per second for
+--duration seconds. A share of requests are retries that reuse an earlier
+Idempotency-Key, and the final row count must equal the number of distinct
+keys. Also reports how many batched transactions the writer used.
+
+Run from python_backend/:
+    DATABASE_URL=sqlite:// BCRYPT_ROUNDS=4 python -m benchmarks.bench_bookings --rate 300 --duration 10
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+from sqlalchemy import select, func
+
+from main import app, booking_writer
+from models.booking import Booking
+from benchmarks.common import percentile, use_database
+
+
+async def run(rate, duration, users, retry_share, seed, database_url):
+    engine = await use_database(app, "bench_bookings", database_url, pool_size=20)
+    booking_writer.bind = engine
+    booking_writer.start()
+    rng = random.Random(seed)
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    statuses = {}
+    keys = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+        emails = [f"booker{i}@example.com" for i in range(users)]
+        for email in emails:
+            await client.post("/register", data={"email": email, "password": "pw", "first_name": "B", "last_name": "U"})
+
+        async def book(email, key):
+            form = {"email": email, "destination": "Goa", "price": 4500,
+                    "date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}
+            start = time.perf_counter()
+            resp = await client.post("/book", data=form, headers={"Idempotency-Key": key})
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        tasks = []
+        total = int(rate * duration)
+        start = time.perf_counter()
+        for i in range(total):
+            # Open loop: requests go out on schedule whether or not earlier ones finished
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if keys and rng.random() < retry_share:
+                email, key = rng.choice(keys)
+            else:
+                email, key = rng.choice(emails), f"key-{i}"
+                keys.append((email, key))
+            tasks.append(asyncio.create_task(book(email, key)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    await booking_writer.stop()
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(func.count()).select_from(Booking))).scalar()
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"requests:        {total} in {elapsed:.1f}s ({total / elapsed:.0f}/s)  {statuses}")
+    print(f"latency ms:      p50 {percentile(latencies, 50):.1f}  p95 {percentile(latencies, 95):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}  max {max(latencies):.1f}")
+    print(f"bookings stored: {rows} (distinct keys: {len(keys)})")
+    print(f"write batches:   {booking_writer.batches} ({booking_writer.rows / max(booking_writer.batches, 1):.1f} rows/batch)")
+    if rows != len(keys):
+        raise SystemExit("Idempotency violated: stored bookings != distinct keys")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=300)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--retry-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.rate, args.duration, args.users, args.retry_share, args.seed, args.database_url))
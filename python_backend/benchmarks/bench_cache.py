@@ -0,0 +1,88 @@
+"""Compare catalogue req/s with the response cache on and off.
+
+Replays a seeded mix of /search, /hotels, /buses and /suggest_cities
+requests (a small hot set, like repeated page views) and reports req/s,
+cache counters and how many conditional requests got a 304.
+
+Run from python_backend/:
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_cache --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from main import app, MOCK_DESTINATIONS, MOCK_HOTELS, MOCK_BUSES
+from database.loader import seed_mock_inventory
+from utils.cache import response_cache
+from benchmarks.common import use_database
+
+
+def request_mix(rng, count):
+    cities = list(MOCK_HOTELS)
+    prefixes = ["go", "man", "ja", "de", "mum", "bang", "hyd", "sh"]
+    mix = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            mix.append(("/suggest_cities", {"query": rng.choice(prefixes)}))
+        elif kind < 0.6:
+            mix.append(("/search", {"to_city": rng.choice(cities + [""])}))
+        elif kind < 0.8:
+            mix.append(("/hotels", {"city": rng.choice(cities)}))
+        else:
+            mix.append(("/buses", {"city": rng.choice(cities)}))
+    return mix
+
+
+async def replay(client, mix, concurrency, conditional):
+    etags = {}
+    remaining = iter(mix)
+    statuses = {}
+
+    async def worker():
+        for path, params in remaining:
+            key = (path, tuple(sorted(params.items())))
+            headers = {"If-None-Match": etags[key]} if conditional and key in etags else {}
+            resp = await client.get(path, params=params, headers=headers)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+            if "etag" in resp.headers:
+                etags[key] = resp.headers["etag"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(mix) / (time.perf_counter() - start), statuses
+
+
+async def run(requests, concurrency, seed):
+    engine = await use_database(app, "bench_cache", pool_size=concurrency)
+    await seed_mock_inventory(MOCK_DESTINATIONS, MOCK_HOTELS, MOCK_BUSES, engine)
+    mix = request_mix(random.Random(seed), requests)
+    transport = httpx.ASGITransport(app=app)
+
+    print(f"{'mode':24} {'req/s':>10}  statuses")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, enabled, conditional in (("no cache", False, False),
+                                             ("cache", True, False),
+                                             ("cache + If-None-Match", True, True)):
+            response_cache.enabled = enabled
+            response_cache.local.clear()
+            rate, statuses = await replay(client, mix, concurrency, conditional)
+            print(f"{label:24} {rate:>10.1f}  {statuses}")
+    print(f"cache stats: {response_cache.stats()}")
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.requests, args.concurrency, args.seed))
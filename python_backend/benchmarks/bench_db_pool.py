@@ -0,0 +1,75 @@
+"""Show register/login throughput as the database pool grows.
+
+Each pool size gets a fresh SQLite file and a burst of concurrent
+register+login pairs. With the async session layer, throughput should
+climb with the pool size instead of staying flat (serialized on the loop).
+Only 2xx responses count towards throughput, and the bcrypt queue is sized
+from --concurrency so the run measures the database, not admission control.
+SQLite still serializes writers, so pass --database-url with a Postgres
+URL to see the clearest scaling.
+
+Run from python_backend/:
+    DATABASE_URL=sqlite:// BCRYPT_ROUNDS=4 python -m benchmarks.bench_db_pool --users 300 --pools 1,2,4,8,16
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from main import app
+from utils import passwords
+from benchmarks.common import use_database
+
+
+async def run_pool(pool_size, users, concurrency, database_url):
+    engine = await use_database(app, f"bench_pool_{pool_size}", database_url, pool_size=pool_size)
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(users))
+    statuses = {}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in remaining:
+                form = {"email": f"pool{pool_size}-user{i}@example.com", "password": "secret-password",
+                        "first_name": "Bench", "last_name": str(i)}
+                for path, data in (("/register", form),
+                                   ("/login", {"email": form["email"], "password": form["password"]})):
+                    resp = await client.post(path, data=data)
+                    statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+    succeeded = sum(count for status, count in statuses.items() if 200 <= status < 300)
+    return succeeded / elapsed, statuses
+
+
+async def run(users, pools, concurrency, database_url):
+    # Every virtual user may have a hash in flight; don't let the queue turn them into 503s
+    passwords.PASSWORD_QUEUE_SIZE = max(passwords.PASSWORD_QUEUE_SIZE, concurrency)
+    await passwords.start_pool()
+    print(f"{'pool':>5} {'ok req/s':>10}  statuses")
+    failed = False
+    for pool_size in pools:
+        rate, statuses = await run_pool(pool_size, users, concurrency, database_url)
+        print(f"{pool_size:>5} {rate:>10.1f}  {statuses}")
+        failed = failed or any(not 200 <= status < 300 for status in statuses)
+    passwords.shutdown_pool()
+    if failed:
+        print("warning: some requests failed; their share of the run is not counted as throughput")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--pools", default="1,2,4,8,16")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.users, [int(p) for p in args.pools.split(",")], args.concurrency, args.database_url))
@@ -0,0 +1,125 @@
+"""Seeded inventory benchmark: bulk CSV load plus filtered, paginated queries.
+
+Generates N hotels, N buses and N destination packages across the
+INDIAN_CITIES list, loads them with database.loader (batched inserts), then
+times /hotels, /buses and /search with price, departure-window and cursor
+parameters. The response cache is off while timing, so every request hits
+the database.
+
+Run from python_backend/:
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_inventory --rows 300000
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from main import app
+from database.loader import load_csv
+from models.destination import Destination
+from models.hotel import Hotel
+from models.bus import Bus
+from utils.cache import response_cache
+from utils.indian_cities import INDIAN_CITIES
+from benchmarks.common import percentile, use_database
+
+CITIES = sorted(set(INDIAN_CITIES))
+
+
+def write_csvs(directory, rows, seed):
+    rng = random.Random(seed)
+    hotels_path = os.path.join(directory, "hotels.csv")
+    buses_path = os.path.join(directory, "buses.csv")
+    destinations_path = os.path.join(directory, "destinations.csv")
+    with open(hotels_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city", "name", "price", "image"])
+        for i in range(rows):
+            writer.writerow([rng.choice(CITIES), f"Hotel {i}", rng.randint(800, 20000), ""])
+    with open(buses_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["operator", "origin", "destination", "departure", "arrival", "price", "image"])
+        for i in range(rows):
+            origin, destination = rng.sample(CITIES, 2)
+            depart = rng.randint(0, 23 * 60)
+            arrive = (depart + rng.randint(60, 16 * 60)) % (24 * 60)
+            writer.writerow([f"Operator {i % 500}", origin, destination,
+                             f"{depart // 60:02d}:{depart % 60:02d}", f"{arrive // 60:02d}:{arrive % 60:02d}",
+                             rng.randint(300, 4000), ""])
+    with open(destinations_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city", "price", "image"])
+        for _ in range(rows):
+            writer.writerow([rng.choice(CITIES), rng.randint(2000, 30000), ""])
+    return hotels_path, buses_path, destinations_path
+
+
+def query_mix(rng, count):
+    queries = []
+    for _ in range(count):
+        city = rng.choice(CITIES)
+        low = rng.randint(800, 15000)
+        queries.append(("hotels", "/hotels", {"city": city, "min_price": low, "max_price": low + 3000}))
+        queries.append(("hotels -price", "/hotels", {"city": city, "sort": "-price", "limit": 50}))
+        queries.append(("buses window", "/buses", {"city": city, "depart_after": "06:00", "depart_before": "12:00"}))
+        origin = rng.choice(CITIES)
+        queries.append(("buses o->d", "/buses", {"city": city, "origin": origin, "sort": "price"}))
+        queries.append(("search", "/search", {"to_city": city[:3]}))
+    return queries
+
+
+async def run(rows, queries, seed, batch_size):
+    engine = await use_database(app, "bench_inventory", pool_size=4)
+    directory = tempfile.mkdtemp()
+    hotels_path, buses_path, destinations_path = write_csvs(directory, rows, seed)
+
+    start = time.perf_counter()
+    await load_csv(Hotel, hotels_path, engine, batch_size)
+    await load_csv(Bus, buses_path, engine, batch_size)
+    await load_csv(Destination, destinations_path, engine, batch_size)
+    print(f"loaded {rows} hotels + {rows} buses + {rows} destinations in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(seed)
+    latencies = {}
+    # Time the queries, not cache hits on repeated parameters
+    response_cache.enabled = False
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path, params in query_mix(rng, queries):
+            start = time.perf_counter()
+            resp = await client.get(path, params=params)
+            elapsed = (time.perf_counter() - start) * 1000
+            resp.raise_for_status()
+            # Follow one cursor so keyset pages are measured too
+            cursor = resp.json().get("next_cursor")
+            latencies.setdefault(label, []).append(elapsed)
+            if cursor:
+                start = time.perf_counter()
+                (await client.get(path, params={**params, "cursor": cursor})).raise_for_status()
+                latencies.setdefault(label + " page 2", []).append((time.perf_counter() - start) * 1000)
+
+    response_cache.enabled = True
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"{'query':20} {'n':>5} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, values in sorted(latencies.items()):
+        print(f"{label:20} {len(values):>5} {percentile(values, 50):>8.2f} {percentile(values, 99):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    # Bulk-load batches trip the slow-query warning by design
+    logging.disable(logging.WARNING)
+    asyncio.run(run(args.rows, args.queries, args.seed, args.batch_size))
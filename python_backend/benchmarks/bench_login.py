@@ -0,0 +1,87 @@
+"""Measure logins/sec and /health p99 latency while logins are running.
+
+The bcrypt queue is sized from --concurrency so every login is measured
+rather than rejected; pass --keep-queue-size to run with the configured
+PASSWORD_QUEUE_SIZE and see admission control at work. Rejected (503)
+logins are reported separately and never count towards logins/sec.
+
+Run from python_backend/:
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_login --logins 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+
+from main import app
+from utils import passwords
+from benchmarks.common import percentile, use_database
+
+
+async def run(logins, concurrency, keep_queue_size):
+    if not keep_queue_size:
+        passwords.PASSWORD_QUEUE_SIZE = max(passwords.PASSWORD_QUEUE_SIZE, concurrency)
+    # One connection per in-flight request so the pool itself never becomes the bottleneck
+    engine = await use_database(app, "bench_login", pool_size=concurrency)
+    await passwords.start_pool()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        form = {"email": "bench@example.com", "password": "secret-password",
+                "first_name": "Bench", "last_name": "User"}
+        await client.post("/register", data=form)
+
+        done = asyncio.Event()
+        health_latencies = []
+
+        async def probe_health():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        remaining = iter(range(logins))
+        statuses = {}
+
+        async def login_worker():
+            for _ in remaining:
+                resp = await client.post("/login", data={"email": form["email"], "password": form["password"]})
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        prober = asyncio.create_task(probe_health())
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    passwords.shutdown_pool()
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"bcrypt rounds:     {passwords.BCRYPT_ROUNDS}")
+    print(f"password workers:  {passwords.PASSWORD_WORKERS} (queue size {passwords.PASSWORD_QUEUE_SIZE})")
+    print(f"logins:            {logins} in {elapsed:.2f}s ({statuses})")
+    print(f"logins/sec:        {statuses.get(200, 0) / elapsed:.1f}")
+    rejected = statuses.get(503, 0)
+    print(f"503 rate:          {rejected / logins:.1%}")
+    print(f"/health samples:   {len(health_latencies)}")
+    print(f"/health p50 (ms):  {statistics.median(health_latencies):.2f}")
+    print(f"/health p99 (ms):  {percentile(health_latencies, 99):.2f}")
+    if rejected:
+        print(f"warning: {rejected} logins were rejected by admission control; logins/sec only counts the 200s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--keep-queue-size", action="store_true",
+                        help="don't raise PASSWORD_QUEUE_SIZE to --concurrency")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.logins, args.concurrency, args.keep_queue_size))
@@ -0,0 +1,113 @@
+"""Outbox delivery throughput and lag against a local aiosmtpd server.
+
+Queues --emails rows, starts an in-process aiosmtpd stand-in (optionally
+answering 451 to a share of messages to exercise retry/backoff, and 550 to
+a few to exercise the dead-letter state), then runs OutboxWorker until the
+outbox is drained and checks every message was delivered exactly once.
+
+Run from python_backend/ (requires `pip install -r requirements-dev.txt`):
+    DATABASE_URL=sqlite:// OUTBOX_BACKOFF_SECONDS=0.05 python -m benchmarks.bench_outbox --emails 2000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import insert, select, func
+
+from database.connection import make_engine, init_db
+from models.email_outbox import EmailOutbox, PENDING, SENT, DEAD
+from workers.email_outbox import OutboxWorker, SMTPPool
+
+
+class FlakyHandler:
+    def __init__(self, fail_rate, reject_rate, seed):
+        self.rng = random.Random(seed)
+        self.fail_rate = fail_rate
+        self.reject_rate = reject_rate
+        self.delivered = []
+
+    async def handle_DATA(self, server, session, envelope):
+        roll = self.rng.random()
+        if roll < self.reject_rate:
+            return "550 Mailbox unavailable"
+        if roll < self.reject_rate + self.fail_rate:
+            return "451 Try again later"
+        self.delivered.append(envelope.rcpt_tos[0])
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(emails, fail_rate, reject_rate, rate_limit, connections, seed):
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_outbox.db")
+    engine = make_engine(f"sqlite:///{db_path}")
+    await init_db(engine)
+    now = datetime.now(timezone.utc)
+    rows = [{"id": str(uuid.uuid4()), "recipient": f"user{i}@example.com", "subject": "Booking confirmed",
+             "body": "Your trip is confirmed.", "status": PENDING, "attempts": 0,
+             "created_at": now, "next_attempt_at": now} for i in range(emails)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(EmailOutbox), rows)
+
+    handler = FlakyHandler(fail_rate, reject_rate, seed)
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    smtp = SMTPPool(host="127.0.0.1", port=port,
+                    username="", password="", starttls=False, size=connections)
+    worker = OutboxWorker(bind=engine, smtp=smtp, rate_limit=rate_limit, poll_interval=0.05)
+
+    stop = asyncio.Event()
+    start = time.perf_counter()
+    task = asyncio.create_task(worker.run(stop))
+    while True:
+        async with engine.connect() as conn:
+            pending = (await conn.execute(
+                select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status == PENDING))).scalar()
+        if not pending:
+            break
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    controller.stop()
+
+    async with engine.connect() as conn:
+        counts = dict((await conn.execute(
+            select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status))).all())
+    await engine.dispose()
+
+    stats = worker.stats()
+    print(f"emails:      {emails} drained in {elapsed:.2f}s ({counts.get(SENT, 0) / elapsed:.1f} sent/s)")
+    print(f"statuses:    {counts}")
+    print(f"worker:      {stats}")
+    print(f"delivered:   {len(handler.delivered)} messages, {len(set(handler.delivered))} distinct recipients")
+    if len(handler.delivered) != counts.get(SENT, 0) or len(set(handler.delivered)) != len(handler.delivered):
+        raise SystemExit("Delivered messages don't match rows marked sent")
+    if counts.get(SENT, 0) + counts.get(DEAD, 0) != emails:
+        raise SystemExit("Some emails were neither sent nor dead-lettered")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="share of 451 (retryable) replies")
+    parser.add_argument("--reject-rate", type=float, default=0.01, help="share of 550 (permanent) replies")
+    parser.add_argument("--rate-limit", type=float, default=0, help="emails/sec, 0 = unlimited")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    asyncio.run(run(args.emails, args.fail_rate, args.reject_rate, args.rate_limit, args.connections, args.seed))
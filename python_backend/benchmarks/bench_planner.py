@@ -0,0 +1,94 @@
+"""Trip planner benchmark on a synthetic national bus network.
+
+Places --cities cities (INDIAN_CITIES plus synthetic towns) on a plane and
+generates --legs timed bus legs between nearby cities, with price and
+duration growing with distance. Reports graph build time, incremental
+update time and plan() latency for random origin/destination pairs.
+
+Run from python_backend/:  python -m benchmarks.bench_planner --cities 3000 --legs 100000
+"""
+import argparse
+import math
+import random
+import time
+
+from utils.indian_cities import INDIAN_CITIES
+from utils.route_planner import RouteGraph, leg_from_bus, format_hhmm
+from benchmarks.common import percentile
+
+
+def synthetic_network(cities, legs, seed):
+    rng = random.Random(seed)
+    names = list(dict.fromkeys(INDIAN_CITIES))
+    names += [f"Town {i}" for i in range(max(0, cities - len(names)))]
+    points = {name: (rng.random() * 2000, rng.random() * 2000) for name in names}
+    # Link each city to its nearest neighbours so the network looks like real routes
+    grid = {}
+    for name, (x, y) in points.items():
+        grid.setdefault((int(x // 100), int(y // 100)), []).append(name)
+    neighbours = {}
+    for name, (x, y) in points.items():
+        gx, gy = int(x // 100), int(y // 100)
+        near = [other for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                for other in grid.get((gx + dx, gy + dy), []) if other != name]
+        neighbours[name] = near or [rng.choice(names)]
+    buses = []
+    for i in range(legs):
+        origin = rng.choice(names)
+        destination = rng.choice(neighbours[origin])
+        distance = math.dist(points[origin], points[destination])
+        depart = rng.randrange(0, 24 * 60, 15)
+        duration = int(60 + distance * 2.5)
+        buses.append({"id": i, "operator": f"Operator {i % 300}", "origin": origin, "destination": destination,
+                      "departure": format_hhmm(depart), "arrival": format_hhmm(depart + duration),
+                      "price": int(200 + distance * 3 * rng.uniform(0.8, 1.3))})
+    return names, points, buses
+
+
+def main(cities, legs, queries, k, max_legs, seed):
+    names, points, buses = synthetic_network(cities, legs, seed)
+    start = time.perf_counter()
+    graph = RouteGraph(names)
+    graph.add_legs(leg_from_bus(b) for b in buses)
+    print(f"graph: {len(names)} cities, {len(graph)} legs, built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    extra = synthetic_network(cities, 1000, seed + 1)[2]
+    for i, bus in enumerate(extra):
+        bus["id"] = legs + i
+    start = time.perf_counter()
+    graph.add_legs(leg_from_bus(b) for b in extra)
+    graph.remove_legs(b["id"] for b in extra)
+    print(f"incremental: +1000 / -1000 legs in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < queries:
+        origin, destination = rng.sample(names, 2)
+        # Far enough apart to need one or two connections
+        if 150 < math.dist(points[origin], points[destination]) < 350:
+            pairs.append((origin, destination))
+
+    for rank in ("price", "arrival"):
+        latencies = []
+        found = 0
+        for origin, destination in pairs:
+            started = time.perf_counter()
+            itineraries = graph.plan(origin, destination, depart_after=rng.randrange(0, 24 * 60),
+                                     k=k, rank=rank, max_legs=max_legs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found += bool(itineraries)
+        print(f"rank={rank:8} queries={len(pairs)} with results={found}  "
+              f"p50 {percentile(latencies, 50):.2f} ms  p99 {percentile(latencies, 99):.2f} ms  "
+              f"max {max(latencies):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=3000)
+    parser.add_argument("--legs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--max-legs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=21)
+    args = parser.parse_args()
+    main(args.cities, args.legs, args.queries, args.k, args.max_legs, args.seed)
@@ -0,0 +1,70 @@
+"""Microbenchmark: CityIndex.suggest vs the old per-keystroke list scan.
+
+Builds an index over INDIAN_CITIES plus synthetic town names (about 8,000
+in total by default) and replays every prefix of a set of typed queries.
+
+Run from python_backend/:  python -m benchmarks.bench_suggest --towns 8000
+"""
+import argparse
+import random
+import string
+import time
+
+from utils.city_index import CityIndex
+from utils.indian_cities import INDIAN_CITIES, CITY_ALIASES
+from benchmarks.common import percentile
+
+
+def legacy_suggest(cities, query):
+    # The original /suggest_cities implementation
+    query = query.strip().lower()
+    if not query:
+        return []
+    suggestions = [city for city in cities if query in city.lower()]
+    return suggestions[:8]
+
+
+def synthetic_towns(count, seed):
+    rng = random.Random(seed)
+    syllables = ["pur", "nagar", "abad", "gaon", "garh", "ganj", "wadi", "kot", "pet", "halli"]
+    names = set()
+    while len(names) < count:
+        stem = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 6)))
+        names.add((stem + rng.choice(syllables)).title())
+    return sorted(names)
+
+
+def time_calls(func, queries):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        func(q)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def main(towns, seed):
+    names = INDIAN_CITIES + synthetic_towns(max(0, towns - len(INDIAN_CITIES)), seed)
+    start = time.perf_counter()
+    index = CityIndex([(name, rank) for rank, name in enumerate(names)], CITY_ALIASES)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(seed)
+    typed = ["Bangalore", "bengaluru", "Hydrabad", "Varanasi", "prayagraj", "Shmla", "mum", "Goa"]
+    typed += rng.sample(names, 200)
+    # Every keystroke of every query, like the frontend sends them
+    queries = [word[:i] for word in typed for i in range(1, len(word) + 1)]
+
+    print(f"cities indexed: {len(index)}  build: {build_ms:.1f} ms  queries: {len(queries)}")
+    print(f"{'':10} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+    for label, func in (("legacy", lambda q: legacy_suggest(names, q)), ("index", index.suggest)):
+        latencies = time_calls(func, queries)
+        print(f"{label:10} {percentile(latencies, 50):>10.1f} {percentile(latencies, 99):>10.1f} {max(latencies):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--towns", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.towns, args.seed)
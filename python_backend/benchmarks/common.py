@@ -0,0 +1,33 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import tempfile
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from database.connection import make_engine, init_db, get_db
+from utils.metrics import instrument_engine
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def use_database(app, name, url=None, pool_size=10, max_overflow=0):
+    """Point the app's get_db at url (default: a fresh SQLite file) and return its engine."""
+    if url is None:
+        url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), f"{name}.db")
+    engine = make_engine(url, pool_size=pool_size, max_overflow=max_overflow)
+    await init_db(engine)
+    instrument_engine(engine)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    return engine
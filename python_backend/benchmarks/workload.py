@@ -0,0 +1,200 @@
+"""Seeded dataset and mixed request workload for benchmarks.loadtest.
+
+The dataset is generated from a fixed seed, so every run starts from the same
+rows. Each scenario turns a Random into one request; the mix weights roughly
+follow what the frontend sends (lots of autocomplete and browsing, fewer
+logins and bookings).
+"""
+import itertools
+import random
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import insert, select, func
+
+from database.connection import init_db
+from database.loader import insert_rows
+from models.booking import Booking
+from models.bus import Bus
+from models.destination import Destination
+# Imported so init_db creates every table before any app worker starts
+from models.email_outbox import EmailOutbox  # noqa: F401
+from models.hotel import Hotel
+from models.user import User
+from utils.indian_cities import INDIAN_CITIES
+from utils.passwords import hasher
+
+CITIES = sorted(set(INDIAN_CITIES))
+PASSWORD = "loadtest-password"
+STATIC_PATHS = ("/", "/static/app.js", "/static/styles.css", "/favicon.ico")
+
+
+def user_email(i):
+    return f"loadtest-user{i}@example.com"
+
+
+def hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def random_date(rng):
+    return date(2026, rng.randint(1, 12), rng.randint(1, 28))
+
+
+async def seed_dataset(bind, hotels, buses, users, bookings, seed):
+    """Fill an empty database deterministically; returns the seeded users' emails.
+
+    A database that already has the load-test users is left as it is, so a
+    Postgres dataset can be reused across runs.
+    """
+    await init_db(bind)
+    emails = [user_email(i) for i in range(users)]
+    async with bind.connect() as conn:
+        seeded = (await conn.execute(select(func.count()).select_from(User).where(User.email.in_(emails[:1])))).scalar()
+    if seeded:
+        return emails
+
+    rng = random.Random(seed)
+    await insert_rows(Destination, ({"city": city, "price": rng.randint(2000, 9000), "image": ""} for city in CITIES), bind)
+    await insert_rows(Hotel, (
+        {"city": rng.choice(CITIES), "name": f"Hotel {i}", "price": rng.randint(800, 20000), "image": ""}
+        for i in range(hotels)
+    ), bind)
+
+    def bus(i):
+        origin, destination = rng.sample(CITIES, 2)
+        depart = rng.randint(0, 23 * 60)
+        arrive = (depart + rng.randint(60, 16 * 60)) % (24 * 60)
+        return {"operator": f"Operator {i % 500}", "origin": origin, "destination": destination,
+                "departure": hhmm(depart), "arrival": hhmm(arrive), "price": rng.randint(300, 4000), "image": ""}
+    await insert_rows(Bus, (bus(i) for i in range(buses)), bind)
+
+    # Every user shares one hash; hashing hundreds of passwords would dominate the setup time
+    hashed = hasher.hash(PASSWORD)
+    user_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in emails]
+    now = datetime.now(timezone.utc)
+    async with bind.begin() as conn:
+        await conn.execute(insert(User), [
+            {"id": user_id, "email": email, "first_name": "Load", "last_name": "Test",
+             "hashed_password": hashed, "is_active": True, "is_admin": False}
+            for user_id, email in zip(user_ids, emails)
+        ])
+        if bookings:
+            await conn.execute(insert(Booking), [
+                {"id": str(uuid.UUID(int=rng.getrandbits(128))), "user_id": rng.choice(user_ids),
+                 "destination": rng.choice(CITIES), "date": random_date(rng), "passengers": rng.randint(1, 4),
+                 "price": rng.randint(2000, 20000), "created_at": now}
+                for _ in range(bookings)
+            ])
+    return emails
+
+
+class Workload:
+    """Picks weighted scenarios and builds their requests.
+
+    run_id keeps registration emails and idempotency keys unique when the
+    same database is reused by later runs.
+    """
+
+    def __init__(self, emails, weights, run_id):
+        self.emails = emails
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.names]
+        self.run_id = run_id
+        self.counter = itertools.count()
+
+    def next(self, rng):
+        """Return (scenario name, method, url, httpx request kwargs)."""
+        name = rng.choices(self.names, self.weights)[0]
+        method, url, kwargs = SCENARIOS[name][1](self, rng)
+        return name, method, url, kwargs
+
+    def unique(self):
+        return f"{self.run_id}-{next(self.counter)}"
+
+
+def suggest_cities(workload, rng):
+    city = rng.choice(CITIES)
+    return "GET", "/suggest_cities", {"params": {"query": city[:rng.randint(1, 5)]}}
+
+
+def search(workload, rng):
+    to_city = rng.choice(CITIES)
+    if rng.random() < 0.5:
+        return "GET", "/search", {"params": {"to_city": to_city[:3]}}
+    params = {"from_city": rng.choice(CITIES), "to_city": to_city, "depart_after": hhmm(rng.randint(0, 23) * 60),
+              "include_hotel": rng.random() < 0.5}
+    return "GET", "/search", {"params": params}
+
+
+def hotels(workload, rng):
+    params = {"city": rng.choice(CITIES)}
+    if rng.random() < 0.5:
+        low = rng.randint(8, 150) * 100
+        params.update(min_price=low, max_price=low + 3000)
+    else:
+        params["sort"] = rng.choice(("price", "-price"))
+    return "GET", "/hotels", {"params": params}
+
+
+def buses(workload, rng):
+    params = {"city": rng.choice(CITIES)}
+    if rng.random() < 0.5:
+        # Window stays inside the day; "24:00" is not a valid time for /buses
+        start = rng.randint(0, 17)
+        params.update(depart_after=hhmm(start * 60), depart_before=hhmm((start + 6) * 60))
+    else:
+        params.update(origin=rng.choice(CITIES), sort="price")
+    return "GET", "/buses", {"params": params}
+
+
+def register(workload, rng):
+    data = {"email": f"loadtest-new-{workload.unique()}@example.com", "password": PASSWORD,
+            "first_name": "New", "last_name": "User"}
+    return "POST", "/register", {"data": data}
+
+
+def login(workload, rng):
+    return "POST", "/login", {"data": {"email": rng.choice(workload.emails), "password": PASSWORD}}
+
+
+def book(workload, rng):
+    data = {"email": rng.choice(workload.emails), "destination": rng.choice(CITIES),
+            "price": rng.randint(2000, 20000), "date": random_date(rng).isoformat(),
+            "passengers": rng.randint(1, 4)}
+    return "POST", "/book", {"data": data, "headers": {"Idempotency-Key": workload.unique()}}
+
+
+def bookings(workload, rng):
+    return "GET", "/bookings", {"params": {"email": rng.choice(workload.emails)}}
+
+
+def static(workload, rng):
+    return "GET", rng.choice(STATIC_PATHS), {}
+
+
+# name -> (default weight, request builder)
+SCENARIOS = {
+    "suggest_cities": (25, suggest_cities),
+    "search": (15, search),
+    "hotels": (15, hotels),
+    "buses": (12, buses),
+    "bookings": (8, bookings),
+    "book": (6, book),
+    "static": (10, static),
+    "login": (6, login),
+    "register": (3, register),
+}
+
+
+def parse_mix(spec):
+    """Default weights, overridden by "name=weight,..." (weight 0 drops a scenario)."""
+    weights = {name: weight for name, (weight, _) in SCENARIOS.items()}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight)
+    if not any(weights.values()):
+        raise ValueError("The mix needs at least one scenario with a positive weight")
+    return weights
@@ -0,0 +1,116 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import logging
+import os
+import time
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from database.connection import engine as default_engine
+
+BOOKING_BATCH_SIZE = int(os.getenv("BOOKING_BATCH_SIZE", "100"))
+# How long the first queued row waits for others to share its transaction
+BOOKING_BATCH_DELAY_MS = float(os.getenv("BOOKING_BATCH_DELAY_MS", "5"))
+
+
+def _resolve(future, result=None, error=None):
+    # The waiting request may have been cancelled (client went away)
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class BatchWriter:
+    """Coalesces single-row inserts from concurrent requests into one transaction.
+
+    submit() queues the row, plus any related rows that must commit with it
+    (e.g. an outbox email), and waits until they are committed. If a batch
+    hits an integrity error (e.g. a duplicate idempotency key), its rows are
+    retried one per transaction so only the offending row fails.
+    """
+
+    def __init__(self, model, bind=None, max_batch=BOOKING_BATCH_SIZE, max_delay_ms=BOOKING_BATCH_DELAY_MS):
+        self.model = model
+        self.bind = bind or default_engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.queue = None
+        self.task = None
+        self.batches = 0
+        self.rows = 0
+
+    def start(self):
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            # Let queued rows commit before shutting down
+            await self.queue.join()
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def submit(self, values, related=()):
+        """related: (model, values) rows inserted in the same transaction, after values."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(((values, tuple(related)), future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _insert(self, items):
+        related = {}
+        for _, extra in items:
+            for model, values in extra:
+                related.setdefault(model, []).append(values)
+        async with self.bind.begin() as conn:
+            await conn.execute(insert(self.model), [values for values, _ in items])
+            for model, rows in related.items():
+                await conn.execute(insert(model), rows)
+
+    async def _flush(self, batch):
+        try:
+            await self._insert([item for item, _ in batch])
+        except IntegrityError:
+            for item, future in batch:
+                try:
+                    await self._insert([item])
+                except Exception as e:
+                    _resolve(future, error=e)
+                else:
+                    _resolve(future, item[0])
+        except Exception as e:
+            logging.error(f"Batched insert into {self.model.__tablename__} failed: {e}")
+            for _, future in batch:
+                _resolve(future, error=e)
+        else:
+            for item, future in batch:
+                _resolve(future, item[0])
+        self.batches += 1
+        self.rows += len(batch)
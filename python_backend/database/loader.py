@@ -0,0 +1,118 @@
+"""Bulk loading of inventory (destinations, hotels, buses).
+
+Usage, from python_backend/:
+    python -m database.loader hotels hotels.csv
+    python -m database.loader buses buses.csv --batch-size 10000
+
+CSV headers must match the model's column names (id is optional).
+"""
+import argparse
+import asyncio
+import csv
+import logging
+from sqlalchemy import Integer, insert, select, func, text
+from database.connection import engine as default_engine, init_db
+from utils.cache import invalidate_inventory
+from models.destination import Destination
+from models.hotel import Hotel
+from models.bus import Bus
+
+MODELS = {"destinations": Destination, "hotels": Hotel, "buses": Bus}
+DEFAULT_BATCH_SIZE = 5000
+# Arbitrary constant naming the Postgres advisory lock held while seeding
+SEED_LOCK_KEY = 727_400_001
+
+
+def _converters(model):
+    converters = {}
+    for column in model.__table__.columns:
+        if isinstance(column.type, Integer):
+            converters[column.name] = lambda v: int(v) if v not in ("", None) else None
+        else:
+            converters[column.name] = lambda v: v if v != "" else None
+    return converters
+
+
+def _prepare(model, row, converters):
+    values = {k: converters[k](v) for k, v in row.items() if k in converters}
+    if model is Destination and "city_key" not in values:
+        values["city_key"] = values["city"].lower()
+    return values
+
+
+async def insert_rows(model, rows, bind=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert dict rows in batches, one short transaction per batch."""
+    converters = _converters(model)
+    stmt = insert(model)
+    count = 0
+    batch = []
+    async def flush():
+        async with (bind or default_engine).begin() as conn:
+            await conn.execute(stmt, batch)
+    for row in rows:
+        batch.append(_prepare(model, row, converters))
+        if len(batch) >= batch_size:
+            await flush()
+            count += len(batch)
+            batch = []
+    if batch:
+        await flush()
+        count += len(batch)
+    await invalidate_inventory(model.__tablename__)
+    return count
+
+
+async def load_csv(model, path, bind=None, batch_size=DEFAULT_BATCH_SIZE):
+    with open(path, newline="", encoding="utf-8") as f:
+        return await insert_rows(model, csv.DictReader(f), bind, batch_size)
+
+
+async def _lock_for_seeding(conn):
+    # Held until the transaction ends, so seeders on other workers wait and then see the rows
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEED_LOCK_KEY})
+    elif conn.dialect.name == "sqlite":
+        # Takes the write lock up front; a deferred BEGIN would let two workers both count 0 rows
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def seed_mock_inventory(destinations, hotels, buses, bind=None):
+    """Fill whichever inventory tables are empty from the built-in mock catalogue.
+
+    Every uvicorn worker calls this at startup, so the checks and inserts run
+    in one transaction behind a lock and only the first worker seeds.
+    """
+    bind = bind or default_engine
+    catalogue = (
+        (Destination, list(destinations)),
+        (Hotel, [{"city": city, **h} for city, items in hotels.items() for h in items]),
+        (Bus, [{"destination": city, **b} for city, items in buses.items() for b in items]),
+    )
+    seeded = []
+    async with bind.begin() as conn:
+        await _lock_for_seeding(conn)
+        for model, rows in catalogue:
+            if not rows or (await conn.execute(select(func.count()).select_from(model))).scalar():
+                continue
+            converters = _converters(model)
+            await conn.execute(insert(model), [_prepare(model, row, converters) for row in rows])
+            seeded.append(model)
+    for model in seeded:
+        await invalidate_inventory(model.__tablename__)
+
+
+async def main(table, path, batch_size):
+    await init_db()
+    count = await load_csv(MODELS[table], path, batch_size=batch_size)
+    logging.info(f"Loaded {count} rows into {table}")
+    await default_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("table", choices=sorted(MODELS))
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.table, args.path, args.batch_size))
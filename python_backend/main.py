@@ -1,20 +1,119 @@
-from fastapi import FastAPI, Request, Form, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, Request, Form, Depends, HTTPException, Query, Header
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError as FastAPIRequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from utils.indian_cities import INDIAN_CITIES
-from database.connection import get_db, Base, engine
+from utils.city_index import build_city_index
+from database.connection import get_db, init_db, engine
 from models.user import User
-from passlib.hash import bcrypt
-from sqlalchemy.orm import Session
+from models.destination import Destination
+from models.hotel import Hotel
+from models.bus import Bus
+from models.booking import Booking
+from models.email_outbox import EmailOutbox
+from workers.email_outbox import outbox_backlog
+from database.batch_writer import BatchWriter
+from database.loader import seed_mock_inventory
+from utils.indian_cities import INDIAN_CITIES
+from utils.route_planner import RouteGraph, leg_from_bus, parse_hhmm, format_hhmm, DEFAULT_MAX_LEGS
+from utils.cache import response_cache
+from utils.metrics import registry, Gauge, MetricsMiddleware, LoopMonitor, instrument_engine
+from utils.logs import log_event
+from utils.pagination import keyset_page, page_result, InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.passwords import (
+    hash_password, verify_password, PasswordPoolBusy, PASSWORD_RETRY_AFTER,
+    start_pool, shutdown_pool, pending_hashes,
+)
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from datetime import date as Date, datetime, timezone
+import uuid
 import os
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 
-app = FastAPI()
+# Coalesces concurrent /book inserts into short batched transactions
+booking_writer = BatchWriter(Booking)
+
+# In-memory timetable of bus legs for the /search trip planner
+route_graph = RouteGraph(INDIAN_CITIES)
+# Row count and highest id of the buses table that route_graph was built from
+route_graph_source = (0, 0)
+
+async def load_route_graph(bind=None):
+    global route_graph_source
+    async with (bind or engine).connect() as conn:
+        rows = (await conn.execute(select(Bus))).all()
+    route_graph.clear()
+    route_graph.add_legs(leg_from_bus(row) for row in rows)
+    route_graph_source = (len(rows), max((row.id for row in rows), default=0))
+    logging.info(f"Route graph loaded with {len(route_graph)} legs")
+
+async def refresh_route_graph(db):
+    """Bring route_graph up to date with buses added since it was built.
+
+    Inventory is loaded by a separate process (python -m database.loader),
+    and every uvicorn worker has its own graph, so each one checks the table
+    itself. New rows are added incrementally; a row count that doesn't add
+    up (deletes, or ids committed out of order) triggers a full reload.
+    Edits to existing rows are only picked up on restart.
+    """
+    global route_graph_source
+    known_count, known_max = route_graph_source
+    count, max_id = (await db.execute(select(func.count(), func.max(Bus.id)))).one()
+    if (count, max_id or 0) == route_graph_source:
+        return
+    rows = (await db.execute(select(Bus).where(Bus.id > known_max))).scalars().all()
+    if known_count + len(rows) != count:
+        await load_route_graph()
+        return
+    route_graph.add_legs(leg_from_bus(row) for row in rows)
+    route_graph_source = (count, max_id)
+
+# Per-statement timing for /metrics, plus slow query logging
+instrument_engine(engine)
+loop_monitor = LoopMonitor()
+
+cache_events = registry.register(Gauge(
+    "travelgo_cache_events", "Response cache hits, misses, 304s, stale copies and evictions since start.", ("kind",)))
+cache_bytes = registry.register(Gauge("travelgo_cache_bytes", "Bytes held by the in-process response cache."))
+booking_batches = registry.register(Gauge(
+    "travelgo_booking_writer", "Batched booking transactions and rows written since start.", ("kind",)))
+password_queue = registry.register(Gauge("travelgo_password_pending", "bcrypt jobs queued or running."))
+route_legs = registry.register(Gauge("travelgo_route_graph_legs", "Bus legs in the trip planner graph."))
+
+def collect_app_metrics():
+    stats = response_cache.stats()
+    for kind in ("hits", "shared_hits", "misses", "not_modified", "stale", "evictions"):
+        cache_events.set(stats[kind], kind)
+    cache_bytes.set(stats["bytes"])
+    booking_batches.set(booking_writer.batches, "batches")
+    booking_batches.set(booking_writer.rows, "rows")
+    password_queue.set(pending_hashes())
+    route_legs.set(len(route_graph))
+
+registry.collectors.append(collect_app_metrics)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Create tables once at startup rather than at import time
+    await init_db()
+    await seed_mock_inventory(MOCK_DESTINATIONS, MOCK_HOTELS, MOCK_BUSES)
+    await load_route_graph()
+    # Spin up the bcrypt worker processes before the first login arrives
+    await start_pool()
+    booking_writer.start()
+    loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    await booking_writer.stop()
+    shutdown_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +126,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and times the whole request
+app.add_middleware(MetricsMiddleware)
 
 # Serve static files (logo, favicon, etc.)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -36,9 +137,6 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 async def favicon():
     return FileResponse("static/favicon.ico")
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 # Updated mock destinations with more places and images
 MOCK_DESTINATIONS = [
     {"city": "Goa", "price": 4500, "image": "https://source.unsplash.com/featured/?goa,beach"},
@@ -72,30 +170,34 @@ MOCK_HOTELS = {
 # Updated mock buses for each city with Unsplash images
 MOCK_BUSES = {
     "Goa": [
-        {"operator": "Goa Express", "departure": "08:00", "arrival": "16:00", "price": 1200, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
-        {"operator": "Beachline Travels", "departure": "14:00", "arrival": "22:00", "price": 1100, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
+        {"operator": "Goa Express", "origin": "Mumbai", "departure": "08:00", "arrival": "16:00", "price": 1200, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
+        {"operator": "Beachline Travels", "origin": "Mumbai", "departure": "14:00", "arrival": "22:00", "price": 1100, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
     ],
     "Manali": [
-        {"operator": "Himalayan Buses", "departure": "07:30", "arrival": "18:00", "price": 1500, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
-        {"operator": "Snow Route", "departure": "13:00", "arrival": "23:00", "price": 1400, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
+        {"operator": "Himalayan Buses", "origin": "Delhi", "departure": "07:30", "arrival": "18:00", "price": 1500, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
+        {"operator": "Snow Route", "origin": "Delhi", "departure": "13:00", "arrival": "23:00", "price": 1400, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
     ],
     "Jaipur": [
-        {"operator": "Royal Rajasthan", "departure": "09:00", "arrival": "17:00", "price": 1000, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
-        {"operator": "Pink City Travels", "departure": "15:00", "arrival": "23:00", "price": 950, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
+        {"operator": "Royal Rajasthan", "origin": "Delhi", "departure": "09:00", "arrival": "17:00", "price": 1000, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
+        {"operator": "Pink City Travels", "origin": "Delhi", "departure": "15:00", "arrival": "23:00", "price": 950, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
     ],
     "Delhi": [
-        {"operator": "Capital Express", "departure": "06:00", "arrival": "14:00", "price": 900, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
-        {"operator": "Monumental Travels", "departure": "12:00", "arrival": "20:00", "price": 850, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
+        {"operator": "Capital Express", "origin": "Jaipur", "departure": "06:00", "arrival": "14:00", "price": 900, "image": "https://images.unsplash.com/photo-1519125323398-675f0ddb6308?auto=format&fit=crop&w=600&q=80"},
+        {"operator": "Monumental Travels", "origin": "Jaipur", "departure": "12:00", "arrival": "20:00", "price": 850, "image": "https://images.unsplash.com/photo-1465101178521-c1a9136a3b99?auto=format&fit=crop&w=600&q=80"}
     ]
 }
 
+# Built once at startup; lookups are a trie walk instead of a scan per keystroke
+CITY_INDEX = build_city_index()
+
 @app.get("/suggest_cities")
-async def suggest_cities(query: str = ""):
-    query = query.strip().lower()
-    if not query:
-        return []
-    suggestions = [city for city in INDIAN_CITIES if query in city.lower()]
-    return suggestions[:8]
+async def suggest_cities(request: Request, query: str = ""):
+    async def build():
+        return CITY_INDEX.suggest(query)
+    return await response_cache.respond(request, "suggest_cities", build, ttl=3600)
+
+async def find_user(db, email):
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
 
 @app.post("/register")
 async def register(
@@ -103,16 +205,15 @@ async def register(
     password: str = Form(...),
     first_name: str = Form(...),
     last_name: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    logging.info(f"Register attempt: {email}, {first_name} {last_name}")
     # Check if user already exists
-    user = db.query(User).filter(User.email == email).first()
+    user = await find_user(db, email)
     if user:
-        logging.warning("Email already registered.")
+        log_event("register_duplicate")
         raise HTTPException(status_code=400, detail="Email already registered.")
-    # Hash the password
-    hashed_password = bcrypt.hash(password)
+    # Hash the password (in the worker pool, off the event loop)
+    hashed_password = await hash_password(password)
     # Create new user
     new_user = User(
         email=email,
@@ -123,81 +224,309 @@ async def register(
         is_admin=False
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    logging.info("Registration successful.")
+    await db.commit()
+    log_event("register_success", user_id=new_user.id)
     return {"message": "Registration successful!", "first_name": new_user.first_name}
 
 @app.post("/login")
 async def login(
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not bcrypt.verify(password, user.hashed_password):
+    user = await find_user(db, email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid email or password.")
+    valid, new_hash = await verify_password(password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password.")
+    # Transparently upgrade hashes made with an older bcrypt cost
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return {"message": "Login successful!", "first_name": user.first_name, "email": user.email}
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache_stats")
+async def cache_stats():
+    return response_cache.stats()
+
+@app.get("/outbox_stats")
+async def outbox_stats(db: AsyncSession = Depends(get_db)):
+    return await outbox_backlog(db)
+
 @app.get("/", include_in_schema=False)
 async def root():
     return FileResponse("static/index.html")
 
+# Allowed ?sort= values: name -> (column, descending, attribute used in the cursor)
+DESTINATION_SORTS = {
+    "price": (Destination.price, False, "price"),
+    "-price": (Destination.price, True, "price"),
+    "city": (Destination.city_key, False, "city_key"),
+}
+HOTEL_SORTS = {
+    "price": (Hotel.price, False, "price"),
+    "-price": (Hotel.price, True, "price"),
+}
+BUS_SORTS = {
+    "departure": (Bus.departure, False, "departure"),
+    "price": (Bus.price, False, "price"),
+    "-price": (Bus.price, True, "price"),
+}
+
+def resolve_sort(sorts, sort):
+    if sort not in sorts:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(sorts)}")
+    return sorts[sort]
+
+def time_of_day(value, name):
+    # Bus.departure is zero-padded "HH:MM" text, so "9:00" has to become "09:00" to compare correctly
+    if value is None:
+        return None
+    try:
+        return format_hhmm(parse_hhmm(value))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be HH:MM.")
+
+def price_filters(stmt, column, min_price, max_price):
+    if min_price is not None:
+        stmt = stmt.where(column >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(column <= max_price)
+    return stmt
+
+async def plan_trips(db, from_city, to_city, depart_after, rank, k, max_legs, include_hotel):
+    if rank not in ("price", "arrival"):
+        raise HTTPException(status_code=400, detail="rank must be one of: price, arrival")
+    try:
+        start = parse_hhmm(depart_after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="depart_after must be HH:MM.")
+    await refresh_route_graph(db)
+    itineraries = route_graph.plan(from_city, to_city, start, k=k, rank=rank, max_legs=max_legs)
+    if include_hotel and itineraries:
+        # Cheapest stay at the destination, straight off the (city, price) index
+        city = itineraries[0]["legs"][-1]["destination"]
+        stmt = select(Hotel).where(Hotel.city == city).order_by(Hotel.price, Hotel.id).limit(1)
+        hotel = (await db.execute(stmt)).scalars().first()
+        for itinerary in itineraries:
+            itinerary["hotel"] = {"id": hotel.id, "name": hotel.name, "price": hotel.price, "image": hotel.image} if hotel else None
+            itinerary["bundle_price"] = itinerary["total_price"] + (hotel.price if hotel else 0)
+    return itineraries
+
 @app.get("/search")
-async def search(from_city: str = "", to_city: str = ""):
-    logging.info(f"Search request: from={from_city}, to={to_city}")
-    results = [d for d in MOCK_DESTINATIONS if to_city.lower() in d["city"].lower()] if to_city else MOCK_DESTINATIONS
-    logging.info(f"Search results: {results}")
-    return {"results": results}
+async def search(
+    request: Request,
+    from_city: str = "",
+    to_city: str = "",
+    min_price: int = None,
+    max_price: int = None,
+    sort: str = "price",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    depart_after: str = "00:00",
+    rank: str = "price",
+    k: int = Query(5, ge=1, le=20),
+    max_legs: int = Query(DEFAULT_MAX_LEGS, ge=1, le=4),
+    include_hotel: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    log_event("search", from_city=from_city, to_city=to_city)
+    async def build():
+        column, descending, attr = resolve_sort(DESTINATION_SORTS, sort)
+        stmt = select(Destination)
+        to_key = to_city.strip().lower()
+        if to_key:
+            # Prefix range on city_key so the (city_key, price) index is usable. This is a
+            # deliberate change from the old substring match: "go" finds Goa, "oa" no longer does
+            stmt = stmt.where(Destination.city_key >= to_key, Destination.city_key < to_key + "\uffff")
+        stmt = price_filters(stmt, Destination.price, min_price, max_price)
+        stmt = keyset_page(stmt, column, Destination.id, cursor, descending, limit)
+        rows, next_cursor = page_result((await db.execute(stmt)).scalars().all(), attr, limit)
+        results = [{"id": d.id, "city": d.city, "price": d.price, "image": d.image} for d in rows]
+        itineraries = []
+        if from_city.strip() and to_city.strip():
+            itineraries = await plan_trips(db, from_city, to_city, depart_after, rank, k, max_legs, include_hotel)
+        return {"results": results, "next_cursor": next_cursor, "itineraries": itineraries}
+    return await response_cache.respond(request, "search", build)
+
+def booking_dict(booking):
+    return {
+        "id": booking.id,
+        "destination": booking.destination,
+        "date": booking.date.isoformat(),
+        "passengers": booking.passengers,
+        "price": booking.price,
+    }
+
+async def find_idempotent_booking(db, user_id, idempotency_key):
+    stmt = select(Booking).where(Booking.user_id == user_id, Booking.idempotency_key == idempotency_key)
+    return (await db.execute(stmt)).scalars().first()
 
 @app.get("/bookings")
-async def get_bookings(email: str):
-    # TODO: Replace with real DB query
-    mock_bookings = [
-        {"destination": "Goa", "date": "2025-07-01", "passengers": 2, "price": 4500},
-        {"destination": "Manali", "date": "2025-08-15", "passengers": 1, "price": 5200},
-    ]
-    return {"bookings": mock_bookings}
+async def get_bookings(
+    email: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db),
+):
+    user = await find_user(db, email)
+    if not user:
+        return {"bookings": [], "next_cursor": None}
+    # Newest trips first, walking the (user_id, date, id) index
+    stmt = select(Booking).where(Booking.user_id == user.id)
+    stmt = keyset_page(stmt, Booking.date, Booking.id, cursor, True, limit)
+    rows, next_cursor = page_result((await db.execute(stmt)).scalars().all(), "date", limit)
+    return {"bookings": [booking_dict(b) for b in rows], "next_cursor": next_cursor}
 
-def send_booking_email(email: str, booking: dict):
-    try:
-        logging.info(f"Sending booking email to {email} for booking: {booking}")
-        # Here you would use smtplib or yagmail to send a real email
-    except Exception as e:
-        logging.error(f"Failed to send booking email: {e}")
+def booking_email(email, booking):
+    # Outbox row committed with the booking; workers/email_outbox.py delivers it
+    return {
+        "id": str(uuid.uuid4()),
+        "recipient": email,
+        "subject": f"Your TravelGo booking to {booking['destination']}",
+        "body": (
+            f"Your trip to {booking['destination']} on {booking['date']} is confirmed.\n"
+            f"Passengers: {booking['passengers']}\n"
+            f"Total price: Rs. {booking['price']}\n"
+            f"Booking reference: {booking['id']}\n"
+        ),
+        "created_at": datetime.now(timezone.utc),
+        "next_attempt_at": datetime.now(timezone.utc),
+    }
 
 @app.post("/book")
 async def book(
-    background_tasks: BackgroundTasks,
     email: str = Form(...),
     destination: str = Form(...),
-    price: int = Form(...),
+    price: int = Form(..., ge=0),
+    date: str = Form(None),
+    passengers: int = Form(1, ge=1),
+    idempotency_key: str = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_db),
 ):
-    logging.info(f"Booking request: {email}, {destination}, {price}")
-    booking = {"destination": destination, "price": price}
-    background_tasks.add_task(send_booking_email, email, booking)
-    logging.info("Booking successful, email task added.")
-    return {"message": "Booking successful! Confirmation email sent.", "booking": booking}
+    user = await find_user(db, email)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+    try:
+        travel_date = Date.fromisoformat(date) if date else Date.today()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="date must be YYYY-MM-DD.")
+    # A retried submission returns the booking made by the first attempt
+    if idempotency_key:
+        existing = await find_idempotent_booking(db, user.id, idempotency_key)
+        if existing:
+            return {"message": "Booking successful! Confirmation email queued.", "booking": booking_dict(existing)}
+    # Release the session's connection before waiting on the batched insert
+    await db.close()
+    values = {
+        "id": str(uuid.uuid4()),
+        "user_id": user.id,
+        "destination": destination,
+        "date": travel_date,
+        "passengers": passengers,
+        "price": price,
+        "idempotency_key": idempotency_key,
+        "created_at": datetime.now(timezone.utc),
+    }
+    booking = booking_dict(Booking(**values))
+    try:
+        await booking_writer.submit(values, [(EmailOutbox, booking_email(email, booking))])
+    except IntegrityError:
+        # Lost a race with a concurrent retry carrying the same key
+        existing = await find_idempotent_booking(db, user.id, idempotency_key) if idempotency_key else None
+        if not existing:
+            raise
+        return {"message": "Booking successful! Confirmation email queued.", "booking": booking_dict(existing)}
+    log_event("booking", user_id=user.id, destination=destination, price=price, passengers=passengers)
+    return {"message": "Booking successful! Confirmation email queued.", "booking": booking}
 
 @app.get("/hotels")
-async def get_hotels(city: str = ""):
+async def get_hotels(
+    request: Request,
+    city: str = "",
+    min_price: int = None,
+    max_price: int = None,
+    sort: str = "price",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db),
+):
     city = city.strip().title()
-    hotels = MOCK_HOTELS.get(city, [])
-    return {"hotels": hotels}
+    async def build():
+        column, descending, attr = resolve_sort(HOTEL_SORTS, sort)
+        stmt = price_filters(select(Hotel).where(Hotel.city == city), Hotel.price, min_price, max_price)
+        stmt = keyset_page(stmt, column, Hotel.id, cursor, descending, limit)
+        rows, next_cursor = page_result((await db.execute(stmt)).scalars().all(), attr, limit)
+        hotels = [{"id": h.id, "city": h.city, "name": h.name, "price": h.price, "image": h.image} for h in rows]
+        return {"hotels": hotels, "next_cursor": next_cursor}
+    return await response_cache.respond(request, "hotels", build)
 
 @app.get("/buses")
-async def get_buses(city: str = ""):
+async def get_buses(
+    request: Request,
+    city: str = "",
+    origin: str = "",
+    depart_after: str = None,
+    depart_before: str = None,
+    min_price: int = None,
+    max_price: int = None,
+    sort: str = "departure",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db),
+):
     city = city.strip().title()
-    buses = MOCK_BUSES.get(city, [])
-    return {"buses": buses}
+    depart_after = time_of_day(depart_after, "depart_after")
+    depart_before = time_of_day(depart_before, "depart_before")
+    async def build():
+        column, descending, attr = resolve_sort(BUS_SORTS, sort)
+        stmt = select(Bus).where(Bus.destination == city)
+        if origin.strip():
+            stmt = stmt.where(Bus.origin == origin.strip().title())
+        # Departure window, as "HH:MM"
+        if depart_after:
+            stmt = stmt.where(Bus.departure >= depart_after)
+        if depart_before:
+            stmt = stmt.where(Bus.departure <= depart_before)
+        stmt = price_filters(stmt, Bus.price, min_price, max_price)
+        stmt = keyset_page(stmt, column, Bus.id, cursor, descending, limit)
+        rows, next_cursor = page_result((await db.execute(stmt)).scalars().all(), attr, limit)
+        buses = [
+            {"id": b.id, "operator": b.operator, "origin": b.origin, "destination": b.destination,
+             "departure": b.departure, "arrival": b.arrival, "price": b.price, "image": b.image}
+            for b in rows
+        ]
+        return {"buses": buses, "next_cursor": next_cursor}
+    return await response_cache.respond(request, "buses", build)
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request, exc):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please try again shortly."},
+        headers={"Retry-After": str(PASSWORD_RETRY_AFTER)},
+    )
 
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return JSONResponse(status_code=404, content={"detail": "Resource not found"})
+    # Deliberate 404s keep their detail ("User not found."); unknown paths get a generic one
+    detail = getattr(exc, "detail", None)
+    if detail in (None, "Not Found"):
+        detail = "Resource not found"
+    return JSONResponse(status_code=404, content={"detail": detail})
 
 @app.exception_handler(FastAPIRequestValidationError)
 async def validation_exception_handler(request, exc):
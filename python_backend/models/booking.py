@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from database.connection import Base
+
+class Booking(Base):
+    __tablename__ = "bookings"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    destination = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    passengers = Column(Integer, nullable=False, default=1)
+    price = Column(Integer, nullable=False)
+    # Client-supplied Idempotency-Key; retries with the same key return the original booking
+    idempotency_key = Column(String)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # Serves /bookings history pages: WHERE user_id = ? ORDER BY date DESC, id DESC
+        Index("ix_bookings_user_date", "user_id", "date", "id"),
+        UniqueConstraint("user_id", "idempotency_key", name="uq_bookings_user_idempotency_key"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Index
+from database.connection import Base
+
+class Bus(Base):
+    __tablename__ = "buses"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    operator = Column(String, nullable=False)
+    # origin is optional: the original catalogue only knew the destination city
+    origin = Column(String)
+    destination = Column(String, nullable=False)
+    # "HH:MM" strings, which sort correctly as text
+    departure = Column(String(5), nullable=False)
+    arrival = Column(String(5), nullable=False)
+    price = Column(Integer, nullable=False)
+    image = Column(String)
+
+    __table_args__ = (
+        Index("ix_buses_origin_destination_departure", "origin", "destination", "departure", "id"),
+        Index("ix_buses_origin_destination_price", "origin", "destination", "price", "id"),
+        Index("ix_buses_destination_departure", "destination", "departure", "id"),
+        Index("ix_buses_destination_price", "destination", "price", "id"),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Index
+from database.connection import Base
+
+class Destination(Base):
+    __tablename__ = "destinations"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    city = Column(String, nullable=False)
+    # Lower-cased city for index-friendly prefix lookups
+    city_key = Column(String, nullable=False)
+    price = Column(Integer, nullable=False)
+    image = Column(String)
+
+    __table_args__ = (
+        Index("ix_destinations_city_key_price", "city_key", "price", "id"),
+        Index("ix_destinations_price", "price", "id"),
+    )
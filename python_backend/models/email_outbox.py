@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from database.connection import Base
+
+# Outbox row states
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Earliest time a worker may (re)try; also serves as the claim lease
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # The worker's claim query: WHERE status = 'pending' AND next_attempt_at <= now
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
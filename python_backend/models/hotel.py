@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Index
+from database.connection import Base
+
+class Hotel(Base):
+    __tablename__ = "hotels"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    city = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    price = Column(Integer, nullable=False)
+    image = Column(String)
+
+    __table_args__ = (
+        # Serves city + price-range filters and the (price, id) keyset cursor
+        Index("ix_hotels_city_price", "city", "price", "id"),
+    )
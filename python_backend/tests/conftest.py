@@ -0,0 +1,26 @@
+import os
+
+# The app binds its engine at import time; tests never touch the default Postgres URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Real bcrypt cost, so logins are slow enough for the concurrency tests to observe
+os.environ["BCRYPT_ROUNDS"] = "12"
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    from database.connection import engine
+    from main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+    # Each test runs its own event loop; the next one must not reuse this loop's connections
+    await engine.dispose()
@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from datetime import date as Date
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from database.batch_writer import BatchWriter
+from database.connection import SessionLocal, make_engine, init_db
+from models.booking import Booking
+from models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_booking_for_unknown_user_keeps_its_detail(client):
+    resp = await client.post("/book", data={"email": "nobody@example.com", "destination": "Goa", "price": 100})
+    assert resp.status_code == 404
+    assert resp.json() == {"detail": "User not found."}
+
+
+async def test_unknown_path_gets_the_generic_404(client):
+    resp = await client.get("/no-such-page")
+    assert resp.json() == {"detail": "Resource not found"}
+
+
+@pytest.mark.parametrize("form", [{"price": -1}, {"price": 100, "passengers": 0}])
+async def test_booking_rejects_negative_price_and_empty_parties(client, form):
+    resp = await client.post("/book", data={"email": "nobody@example.com", "destination": "Goa", **form})
+    assert resp.status_code == 422
+
+
+@pytest.fixture
+async def user(client):
+    # Inserted directly; registering through the API would cost a real bcrypt hash
+    account = User(id=str(uuid.uuid4()), email=f"traveller-{uuid.uuid4().hex[:8]}@example.com",
+                   first_name="Test", last_name="Traveller", hashed_password="unused")
+    async with SessionLocal() as db:
+        db.add(account)
+        await db.commit()
+    return account
+
+
+async def booking_rows(user_id):
+    async with SessionLocal() as db:
+        return (await db.execute(select(Booking).where(Booking.user_id == user_id))).scalars().all()
+
+
+def book_form(user, **form):
+    return {"email": user.email, "destination": "Goa", "price": 4500, "date": "2026-12-01", **form}
+
+
+async def test_retried_idempotency_key_returns_the_original_booking(client, user):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = await client.post("/book", data=book_form(user), headers=headers)
+    second = await client.post("/book", data=book_form(user), headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.json()["booking"] == first.json()["booking"]
+    assert len(await booking_rows(user.id)) == 1
+
+
+async def test_racing_requests_with_one_key_share_a_booking(client, user):
+    from main import booking_writer
+    batches = booking_writer.batches
+    headers = {"Idempotency-Key": "race-1"}
+    responses = await asyncio.gather(*(client.post("/book", data=book_form(user), headers=headers) for _ in range(2)))
+    assert [r.status_code for r in responses] == [200, 200]
+    # Both landed in one batch, so the loser went through the IntegrityError fallback
+    assert booking_writer.batches == batches + 1
+    assert responses[0].json()["booking"] == responses[1].json()["booking"]
+    assert len(await booking_rows(user.id)) == 1
+
+
+async def test_bookings_page_newest_first_to_the_end(client, user):
+    dates = [f"2026-0{month}-15" for month in range(1, 6)]
+    for day in dates:
+        assert (await client.post("/book", data=book_form(user, date=day))).status_code == 200
+    seen = []
+    cursor = None
+    while True:
+        params = {"email": user.email, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/bookings", params=params)).json()
+        assert len(page["bookings"]) <= 2
+        seen += [b["date"] for b in page["bookings"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(dates, reverse=True)
+
+
+async def test_batch_integrity_error_only_fails_the_offending_row(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'bookings.db'}")
+    await init_db(engine)
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{"id": "u1", "email": "u1@example.com", "first_name": "A",
+                                           "last_name": "B", "hashed_password": "unused"}])
+    writer = BatchWriter(Booking, bind=engine, max_delay_ms=50)
+
+    def booking(key):
+        return {"id": str(uuid.uuid4()), "user_id": "u1", "destination": "Goa", "date": Date(2026, 12, 1),
+                "passengers": 1, "price": 100, "idempotency_key": key}
+    try:
+        await writer.submit(booking("taken"))
+        results = await asyncio.gather(writer.submit(booking("a")), writer.submit(booking("taken")),
+                                       writer.submit(booking("b")), return_exceptions=True)
+    finally:
+        await writer.stop()
+        async with engine.connect() as conn:
+            keys = sorted((await conn.execute(select(Booking.idempotency_key))).scalars())
+        await engine.dispose()
+    assert writer.batches == 2
+    assert isinstance(results[1], IntegrityError)
+    assert results[0]["idempotency_key"] == "a" and results[2]["idempotency_key"] == "b"
+    assert keys == ["a", "b", "taken"]
@@ -0,0 +1,89 @@
+import pytest
+from starlette.requests import Request
+
+from utils.cache import RedisBackend, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+class StubRedis:
+    """The few redis.asyncio calls RedisBackend makes, kept in a dict (no expiry)."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+def make_request(query="city=Goa"):
+    return Request({"type": "http", "method": "GET", "path": "/hotels", "query_string": query.encode(), "headers": []})
+
+
+async def test_invalidation_in_one_worker_reaches_the_others():
+    redis = StubRedis()
+    worker_a = ResponseCache(shared=RedisBackend(redis), enabled=True)
+    worker_b = ResponseCache(shared=RedisBackend(redis), enabled=True)
+    price = {"value": 100}
+
+    async def build():
+        return {"price": price["value"]}
+
+    await worker_a.respond(make_request(), "hotels", build)
+    first = await worker_b.respond(make_request(), "hotels", build)
+    assert first.body == b'{"price":100}'
+    assert worker_b.shared_hits == 1
+
+    price["value"] = 200
+    await worker_a.invalidate("hotels")
+    second = await worker_b.respond(make_request(), "hotels", build)
+    assert second.body == b'{"price":200}'
+    assert second.headers["etag"] != first.headers["etag"]
+    assert worker_b.stale == 1
+
+    # The refreshed copy is served from L1 again until the next invalidation
+    await worker_b.respond(make_request(), "hotels", build)
+    assert worker_b.hits == 1
+
+
+class DownRedis:
+    async def get(self, *args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    set = incr = get
+
+
+async def test_local_cache_is_used_when_the_shared_backend_fails():
+    cache = ResponseCache(shared=RedisBackend(DownRedis()), enabled=True)
+    calls = []
+
+    async def build():
+        calls.append(1)
+        return []
+
+    await cache.respond(make_request(), "hotels", build)
+    await cache.respond(make_request(), "hotels", build)
+    assert len(calls) == 1
+    assert cache.hits == 1
+
+
+async def test_invalidation_survives_the_shared_backend_failing():
+    cache = ResponseCache(shared=RedisBackend(DownRedis()), enabled=True)
+    calls = []
+
+    async def build():
+        calls.append(1)
+        return []
+
+    await cache.respond(make_request(), "hotels", build)
+    await cache.invalidate("hotels")
+    # The local copy is still dropped
+    await cache.respond(make_request(), "hotels", build)
+    assert len(calls) == 2
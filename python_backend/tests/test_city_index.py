@@ -0,0 +1,67 @@
+import pytest
+
+from utils.city_index import CityIndex, build_city_index, load_city_file, max_typos
+
+CITY_INDEX = build_city_index()
+
+SMALL = CityIndex(
+    [("Guwahati", 0), ("Bodh Gaya", 1), ("Hyderabad", 2), ("Gangtok", 3), ("Pune", 4), ("Gaya", 5), ("Agra", 6)],
+    {"Gauhati": "Guwahati"},
+)
+
+
+@pytest.mark.parametrize("query, expected", [
+    # Listed twice in INDIAN_CITIES, suggested once
+    ("agra", ["Agra"]),
+    ("varanasi", ["Varanasi"]),
+    ("shim", ["Shimla"]),
+    ("srinagar", ["Srinagar"]),
+    # Aliases resolve to the canonical name
+    ("Bengaluru", ["Bangalore"]),
+    ("prayag", ["Allahabad"]),
+    ("Kashi", ["Varanasi"]),
+    # Case, spaces and punctuation are ignored
+    ("  PUNE ", ["Pune"]),
+    ("", []),
+])
+def test_suggestions_from_the_built_in_cities(query, expected):
+    assert CITY_INDEX.suggest(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("agx", []),                  # 3 letters: exact prefixes only
+    ("pume", ["Pune"]),           # 4-7 letters: one edit
+    ("pxxe", []),
+    ("hydrebad", ["Hyderabad"]),  # 8+ letters: two edits
+    ("hxdrebad", []),
+    ("xune", []),                 # the first letter has to match
+])
+def test_typo_tolerance_grows_with_query_length(query, expected):
+    assert SMALL.suggest(query) == expected
+
+
+@pytest.mark.parametrize("length, typos", [(1, 0), (3, 0), (4, 1), (7, 1), (8, 2), (20, 2)])
+def test_max_typos(length, typos):
+    assert max_typos("x" * length) == typos
+
+
+def test_full_name_prefixes_rank_above_word_and_alias_matches():
+    # Gangtok and Gaya start with "ga"; Guwahati (alias Gauhati) and Bodh Gaya only match
+    # through an alias or a later word. Each tier is ordered by popularity.
+    assert SMALL.suggest("ga") == ["Gangtok", "Gaya", "Guwahati", "Bodh Gaya"]
+    assert SMALL.suggest("ga", limit=2) == ["Gangtok", "Gaya"]
+
+
+def test_load_city_file_reads_aliases_and_popularity(tmp_path):
+    path = tmp_path / "cities.csv"
+    path.write_text(
+        "name,popularity,aliases\n"
+        "Puducherry,,Pondicherry| Pondy\n"
+        "Kochi,1,Cochin\n",
+        encoding="utf-8",
+    )
+    cities, aliases = load_city_file(path)
+    # A blank popularity falls back to the row's position
+    assert cities == [("Puducherry", 0), ("Kochi", 1)]
+    assert aliases == {"Pondicherry": "Puducherry", "Pondy": "Puducherry", "Cochin": "Kochi"}
+    assert build_city_index(path).suggest("pondy") == ["Puducherry"]
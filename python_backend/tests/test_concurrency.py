@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event
+
+from benchmarks.common import use_database
+
+pytestmark = pytest.mark.anyio
+
+USER = {"email": "overlap@example.com", "password": "secret-password", "first_name": "Over", "last_name": "Lap"}
+
+
+async def test_event_loop_keeps_serving_while_logins_hash(client):
+    assert (await client.post("/register", data=USER)).status_code == 200
+    logins = [
+        asyncio.create_task(client.post("/login", data={"email": USER["email"], "password": USER["password"]}))
+        for _ in range(4)
+    ]
+    # Let the logins reach the bcrypt pool before probing
+    await asyncio.sleep(0.05)
+    for path in ("/health", "/hotels?city=Goa"):
+        start = time.perf_counter()
+        resp = await client.get(path)
+        elapsed = time.perf_counter() - start
+        # Answered while the logins were still in flight, without queueing behind them
+        assert resp.status_code == 200
+        assert not all(task.done() for task in logins)
+        assert elapsed < 0.1
+    assert [r.status_code for r in await asyncio.gather(*logins)] == [200] * 4
+
+
+
+@pytest.mark.parametrize("pool_size", [1, 4])
+async def test_database_requests_overlap_up_to_the_pool_size(client, tmp_path, pool_size):
+    from main import app
+    engine = await use_database(app, "overlap", f"sqlite:///{tmp_path / 'overlap.db'}", pool_size=pool_size)
+    peak = 0
+
+    def on_checkout(*args):
+        nonlocal peak
+        peak = max(peak, engine.pool.checkedout())
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    try:
+        responses = await asyncio.gather(*(
+            client.get("/bookings", params={"email": f"nobody{i}@example.com"}) for i in range(8)
+        ))
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+    assert [r.status_code for r in responses] == [200] * 8
+    # Requests hold their own session's connection concurrently, never more than the pool allows
+    assert peak == pool_size
@@ -0,0 +1,193 @@
+import asyncio
+import smtplib
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import insert, select, update
+
+import workers.email_outbox as outbox
+from database.connection import make_engine, init_db
+from models.email_outbox import EmailOutbox, PENDING, SENT, DEAD
+from workers.email_outbox import OutboxWorker, SMTPPool
+
+pytestmark = pytest.mark.anyio
+
+
+class ScriptedHandler:
+    """Accepts mail, except for recipients given a list of replies to send first."""
+
+    def __init__(self):
+        self.replies = {}
+        self.delivered = []
+        self.connections = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        recipient = envelope.rcpt_tos[0]
+        self.connections.add(session.peer)
+        queued = self.replies.get(recipient)
+        if queued:
+            return queued.pop(0)
+        self.delivered.append(recipient)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = ScriptedHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    await init_db(engine)
+    yield engine
+    await engine.dispose()
+
+
+def make_worker(engine, port, **kwargs):
+    smtp = SMTPPool(host="127.0.0.1", port=port, username="", password="", starttls=False, size=1)
+    return OutboxWorker(bind=engine, smtp=smtp, rate_limit=0, poll_interval=0.01, **kwargs)
+
+
+async def enqueue(engine, *recipients):
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        await conn.execute(insert(EmailOutbox), [
+            {"id": str(uuid.uuid4()), "recipient": r, "subject": "Booking confirmed", "body": "See you there.",
+             "status": PENDING, "attempts": 0, "created_at": now, "next_attempt_at": now}
+            for r in recipients
+        ])
+
+
+async def rows(engine):
+    async with engine.connect() as conn:
+        return {r.recipient: r for r in (await conn.execute(select(EmailOutbox))).all()}
+
+
+async def make_due(engine):
+    # Stands in for the backoff or lease running out
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    async with engine.begin() as conn:
+        await conn.execute(update(EmailOutbox).values(next_attempt_at=past))
+
+
+async def test_every_email_is_delivered_exactly_once(engine, smtp_server):
+    handler, port = smtp_server
+    recipients = [f"user{i}@example.com" for i in range(25)]
+    await enqueue(engine, *recipients)
+    worker = make_worker(engine, port, batch_size=10)
+    while await worker.run_once():
+        pass
+    assert sorted(handler.delivered) == sorted(recipients)
+    assert {r.status for r in (await rows(engine)).values()} == {SENT}
+    assert await worker.run_once() == 0
+
+
+async def test_temporary_failure_backs_off_then_retries(engine, smtp_server):
+    handler, port = smtp_server
+    handler.replies["retry@example.com"] = ["451 Try again later"]
+    await enqueue(engine, "retry@example.com")
+    worker = make_worker(engine, port)
+
+    before = datetime.now(timezone.utc)
+    await worker.run_once()
+    row = (await rows(engine))["retry@example.com"]
+    assert row.status == PENDING and row.attempts == 1 and "451" in row.last_error
+    assert outbox.as_utc(row.next_attempt_at) > before
+    # Not due yet, so nothing is claimed
+    assert await worker.run_once() == 0
+
+    await make_due(engine)
+    await worker.run_once()
+    row = (await rows(engine))["retry@example.com"]
+    assert row.status == SENT and row.attempts == 2
+    assert handler.delivered == ["retry@example.com"]
+
+
+async def test_permanent_failure_is_dead_lettered(engine, smtp_server):
+    handler, port = smtp_server
+    handler.replies["gone@example.com"] = ["550 Mailbox unavailable"]
+    await enqueue(engine, "gone@example.com")
+    await make_worker(engine, port).run_once()
+    row = (await rows(engine))["gone@example.com"]
+    assert row.status == DEAD and row.attempts == 1 and "550" in row.last_error
+    assert handler.delivered == []
+
+
+async def test_rows_claimed_by_a_crashed_worker_come_back_after_the_lease(engine, smtp_server, monkeypatch):
+    handler, port = smtp_server
+    monkeypatch.setattr(outbox, "OUTBOX_LEASE_SECONDS", 0.2)
+    await enqueue(engine, "lease@example.com")
+
+    crashed = make_worker(engine, port)
+    assert len(await crashed.claim()) == 1
+    # The crashed worker never sends; while its lease holds nobody else may claim the row
+    other = make_worker(engine, port)
+    assert await other.run_once() == 0
+
+    await asyncio.sleep(0.3)
+    assert await other.run_once() == 1
+    row = (await rows(engine))["lease@example.com"]
+    assert row.status == SENT and row.attempts == 2
+    assert handler.delivered == ["lease@example.com"]
+
+
+async def test_rejected_messages_do_not_cost_the_connection(engine, smtp_server):
+    handler, port = smtp_server
+    handler.replies["retry@example.com"] = ["451 Try again later"]
+    handler.replies["gone@example.com"] = ["550 Mailbox unavailable"]
+    await enqueue(engine, "retry@example.com", "gone@example.com", "ok@example.com")
+    worker = make_worker(engine, port)
+    await worker.run_once()
+    await make_due(engine)
+    await worker.run_once()
+    assert sorted(handler.delivered) == ["ok@example.com", "retry@example.com"]
+    # One pooled connection carried the 451, the 550 and both deliveries
+    assert len(handler.connections) == 1
+
+
+async def test_concurrent_claims_never_share_a_row(engine, smtp_server):
+    _, port = smtp_server
+    await enqueue(engine, *(f"user{i}@example.com" for i in range(30)))
+    workers = [make_worker(engine, port, batch_size=10) for _ in range(4)]
+    claims = await asyncio.gather(*(w.claim() for w in workers))
+    claimed = [row.id for batch in claims for row in batch]
+    assert len(claimed) == len(set(claimed)) == 30
+
+
+async def test_results_are_not_recorded_after_the_lease_is_lost(engine, smtp_server, monkeypatch):
+    handler, port = smtp_server
+    monkeypatch.setattr(outbox, "OUTBOX_LEASE_SECONDS", 0.2)
+    await enqueue(engine, "slow@example.com")
+    slow = make_worker(engine, port)
+    release = asyncio.Event()
+
+    async def stalled_deliver(row):
+        # Outlives the lease, then reports a permanent failure
+        await release.wait()
+        return row, smtplib.SMTPResponseException(550, b"Mailbox unavailable")
+    slow._deliver = stalled_deliver
+
+    stalled = asyncio.create_task(slow.run_once())
+    await asyncio.sleep(0.3)
+    assert await make_worker(engine, port).run_once() == 1
+    release.set()
+    await stalled
+
+    row = (await rows(engine))["slow@example.com"]
+    assert row.status == SENT and row.attempts == 2
+    assert slow.dead == 0
+    assert handler.delivered == ["slow@example.com"]
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import select, func
+
+from database.connection import make_engine, init_db
+from database.loader import insert_rows, seed_mock_inventory
+from models.destination import Destination
+from models.hotel import Hotel
+
+pytestmark = pytest.mark.anyio
+
+DESTINATIONS = [{"city": "Goa", "price": 4500, "image": ""}]
+HOTELS = {"Goa": [{"name": "Goa Beach Resort", "price": 3200, "image": ""}]}
+
+
+async def count(engine, model):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(model))).scalar()
+
+
+async def test_each_empty_table_is_seeded_once(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    await init_db(engine)
+    await insert_rows(Hotel, [{"city": "Delhi", "name": "Existing", "price": 1000, "image": ""}], engine)
+
+    await seed_mock_inventory(DESTINATIONS, HOTELS, {}, engine)
+    await seed_mock_inventory(DESTINATIONS, HOTELS, {}, engine)
+
+    # destinations were empty and get seeded even though hotels already had rows
+    assert await count(engine, Destination) == 1
+    assert await count(engine, Hotel) == 1
+    await engine.dispose()
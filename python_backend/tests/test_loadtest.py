@@ -0,0 +1,82 @@
+import pytest
+
+from benchmarks.loadtest import compare
+from benchmarks.workload import SCENARIOS, parse_mix
+
+SETTINGS = {"mode": "asgi", "workers": 1, "concurrency": 16, "database": "sqlite", "dataset": {}, "mix": {}}
+GATE = {"threshold": 0.1, "max_error_increase": 0.01, "min_requests": 100, "min_latency_delta": 2.0}
+
+
+def stats(rps=100.0, p95=20.0, p99=40.0, error_rate=0.0, requests=1000):
+    return {"requests": requests, "rps": rps, "p95_ms": p95, "p99_ms": p99, "error_rate": error_rate}
+
+
+def run(**scenarios):
+    return {"settings": SETTINGS, "total": stats(), "scenarios": scenarios}
+
+
+def regressions(now, before, **gate):
+    return compare(run(hotels=now), run(hotels=before), **{**GATE, **gate})
+
+
+@pytest.mark.parametrize("now, flagged", [
+    (stats(), False),
+    (stats(rps=95.0), False),             # within the 10% threshold
+    (stats(rps=85.0), True),              # throughput dropped 15%
+    (stats(rps=150.0), False),            # getting faster is fine
+    (stats(p95=25.0), True),              # +25% and +5 ms
+    (stats(p99=50.0), True),
+    (stats(p99=42.0), False),             # +5% only
+    (stats(error_rate=0.005), False),     # +0.5 points
+    (stats(error_rate=0.02), True),       # +2 points
+])
+def test_compare_flags_regressions_beyond_the_threshold(now, flagged):
+    found = regressions(now, stats())
+    assert bool(found) is flagged
+    assert all(line.startswith("hotels:") for line in found)
+
+
+def test_small_absolute_latency_rises_are_ignored():
+    # 1 ms -> 1.5 ms is +50%, but below min_latency_delta
+    assert regressions(stats(p95=1.5, p99=1.5), stats(p95=1.0, p99=1.0)) == []
+    assert regressions(stats(p95=1.5), stats(p95=1.0), min_latency_delta=0.1) == ["hotels: p95_ms 1.0 -> 1.5"]
+
+
+def test_scenarios_with_too_few_requests_are_skipped():
+    slow = stats(rps=10.0, p95=500.0, error_rate=0.5, requests=50)
+    assert regressions(slow, stats()) == []
+    assert regressions(stats(rps=10.0, requests=1000), stats(requests=50)) == []
+    assert len(regressions(slow, stats(), min_requests=10)) == 3
+
+
+def test_scenarios_missing_from_the_baseline_or_at_zero_are_not_regressions():
+    assert compare(run(book=stats(rps=1.0)), run(), **GATE) == []
+    assert regressions(stats(), stats(rps=0.0, p95=0.0, p99=0.0)) == []
+
+
+def test_total_is_compared_too():
+    now = run()
+    now["total"] = stats(rps=50.0)
+    assert compare(now, run(), **GATE) == ["total: req/s 100.0 -> 50.0"]
+
+
+def test_parse_mix_overrides_and_drops_scenarios():
+    assert parse_mix(None) == {name: weight for name, (weight, _) in SCENARIOS.items()}
+    weights = parse_mix(" login=0, register=0 ,search=2.5,")
+    assert weights["login"] == weights["register"] == 0
+    assert weights["search"] == 2.5
+    assert weights["hotels"] == SCENARIOS["hotels"][0]
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("nope=1", "Unknown scenario 'nope'"),
+    (",".join(f"{name}=0" for name in SCENARIOS), "at least one scenario"),
+])
+def test_parse_mix_rejects_bad_specs(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_mix(spec)
+
+
+def test_parse_mix_rejects_non_numeric_weights():
+    with pytest.raises(ValueError):
+        parse_mix("search=lots")
@@ -0,0 +1,93 @@
+import logging
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import utils.logs as logs
+from database.connection import make_engine
+from utils.logs import log_event, log_events_dropped
+from utils.metrics import db_queries, db_query_errors, instrument_engine
+
+pytestmark = pytest.mark.anyio
+
+
+def sample_value(body, series):
+    for line in body.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+async def test_failed_statements_are_counted_without_leaking_timers(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'metrics.db'}", pool_size=1, max_overflow=0)
+    instrument_engine(engine)
+    errors = db_query_errors.values.get(("SELECT",), 0)
+    timed = db_queries.values.get(("SELECT",), [[0], 0.0])[0][:]
+    try:
+        async with engine.connect() as conn:
+            for _ in range(20):
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM no_such_table"))
+            await conn.execute(text("SELECT 1"))
+            info = dict((await conn.get_raw_connection()).info)
+    finally:
+        await engine.dispose()
+    assert db_query_errors.values[("SELECT",)] == errors + 20
+    assert sum(db_queries.values[("SELECT",)][0]) == sum(timed) + 1
+    assert "query_start" not in info
+
+
+async def test_requests_are_labelled_by_route_template(client):
+    await client.get("/hotels", params={"city": "Goa", "sort": "price"})
+    await client.get("/static/app.js")
+    await client.get("/no-such-page")
+    body = (await client.get("/metrics")).text
+    assert sample_value(body, 'travelgo_http_requests_total{route="/hotels",method="GET",status="200"}') >= 1
+    assert sample_value(body, 'travelgo_http_requests_total{route="/static",method="GET",status="200"}') >= 1
+    assert sample_value(body, 'travelgo_http_requests_total{route="unmatched",method="GET",status="404"}') >= 1
+    # Neither query strings nor file names become label values
+    assert "city=Goa" not in body and "app.js" not in body
+    assert 'travelgo_http_request_duration_seconds_bucket{route="/hotels",method="GET",le="+Inf"}' in body
+    assert "# TYPE travelgo_cache_events gauge" in body
+
+
+@pytest.fixture
+def token_bucket(monkeypatch):
+    def fill(rate):
+        monkeypatch.setattr(logs, "LOG_MAX_PER_SEC", rate)
+        monkeypatch.setattr(logs, "_tokens", rate)
+        monkeypatch.setattr(logs, "_updated", time.monotonic())
+    return fill
+
+
+def dropped(reason):
+    return log_events_dropped.values.get((reason,), 0)
+
+
+def test_routine_events_are_sampled(monkeypatch, caplog, token_bucket):
+    token_bucket(1000)
+    caplog.set_level(logging.INFO, logger="travelgo")
+    monkeypatch.setattr(logs, "LOG_SAMPLE_RATE", 0.0)
+    before = dropped("sampled")
+    for _ in range(10):
+        log_event("search", to_city="Goa")
+    # Warnings skip sampling
+    log_event("login_failed", level=logging.WARNING)
+    assert dropped("sampled") == before + 10
+    assert [r.getMessage() for r in caplog.records] == ['{"event":"login_failed"}']
+
+    monkeypatch.setattr(logs, "LOG_SAMPLE_RATE", 1.0)
+    log_event("search", to_city="Goa")
+    assert caplog.records[-1].getMessage() == '{"event":"search","to_city":"Goa","sample_rate":1.0}'
+
+
+def test_events_are_capped_per_second(caplog, token_bucket):
+    token_bucket(3)
+    caplog.set_level(logging.INFO, logger="travelgo")
+    before = dropped("rate_limited")
+    for _ in range(10):
+        log_event("login_failed", level=logging.WARNING)
+    assert len(caplog.records) == 3
+    assert dropped("rate_limited") == before + 7
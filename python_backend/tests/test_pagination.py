@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import date
+
+import pytest
+
+from models.booking import Booking
+from models.hotel import Hotel
+from utils.pagination import InvalidCursor, encode_cursor, keyset_page
+from sqlalchemy import select
+
+
+def raw_cursor(value, row_id):
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode()
+
+
+def test_valid_cursor_is_accepted():
+    keyset_page(select(Hotel), Hotel.price, Hotel.id, encode_cursor(3200, 7))
+
+
+@pytest.mark.parametrize("value", [{"a": 1}, [1], "x", 1.5, True, None])
+def test_sort_value_must_match_the_column_type(value):
+    with pytest.raises(InvalidCursor):
+        keyset_page(select(Hotel), Hotel.price, Hotel.id, raw_cursor(value, 7))
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(InvalidCursor):
+        keyset_page(select(Hotel), Hotel.price, Hotel.id, "not-a-cursor")
+
+
+@pytest.mark.parametrize("row_id", ["x", 1.5, [7], None])
+def test_row_id_must_match_the_id_column_type(row_id):
+    with pytest.raises(InvalidCursor):
+        keyset_page(select(Hotel), Hotel.price, Hotel.id, raw_cursor(3200, row_id))
+
+
+def test_booking_cursor_takes_an_iso_date_and_a_string_id():
+    keyset_page(select(Booking), Booking.date, Booking.id, encode_cursor(date(2026, 5, 1), "b1"), True)
+    for value, row_id in (("2026-13-01", "b1"), ("2026-05-01", 7)):
+        with pytest.raises(InvalidCursor):
+            keyset_page(select(Booking), Booking.date, Booking.id, raw_cursor(value, row_id), True)
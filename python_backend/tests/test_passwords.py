@@ -0,0 +1,57 @@
+import uuid
+
+import pytest
+from passlib.hash import bcrypt
+
+from database.connection import SessionLocal
+from models.user import User
+from utils import passwords
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_user(hashed_password):
+    account = User(id=str(uuid.uuid4()), email=f"login-{uuid.uuid4().hex[:8]}@example.com",
+                   first_name="Test", last_name="User", hashed_password=hashed_password)
+    async with SessionLocal() as db:
+        db.add(account)
+        await db.commit()
+    return account
+
+
+async def stored_hash(user_id):
+    async with SessionLocal() as db:
+        return (await db.get(User, user_id)).hashed_password
+
+
+async def test_worker_processes_are_running_before_the_first_login(client):
+    processes = passwords._executor._processes
+    assert len(processes) == passwords.PASSWORD_WORKERS
+    assert all(p.is_alive() for p in processes.values())
+    assert passwords._executor._mp_context.get_start_method() != "fork"
+
+
+async def test_login_upgrades_an_outdated_hash(client):
+    user = await add_user(bcrypt.using(rounds=4).hash("secret-password"))
+    resp = await client.post("/login", data={"email": user.email, "password": "secret-password"})
+    assert resp.status_code == 200
+    upgraded = await stored_hash(user.id)
+    assert upgraded.startswith(f"$2b${passwords.BCRYPT_ROUNDS}$")
+    assert bcrypt.verify("secret-password", upgraded)
+
+
+async def test_wrong_password_keeps_the_stored_hash(client):
+    old = bcrypt.using(rounds=4).hash("secret-password")
+    user = await add_user(old)
+    resp = await client.post("/login", data={"email": user.email, "password": "not-it"})
+    assert resp.status_code == 401
+    assert await stored_hash(user.id) == old
+
+
+async def test_full_queue_answers_503_with_retry_after(client, monkeypatch):
+    user = await add_user(bcrypt.using(rounds=4).hash("secret-password"))
+    monkeypatch.setattr(passwords, "PASSWORD_QUEUE_SIZE", 0)
+    resp = await client.post("/login", data={"email": user.email, "password": "secret-password"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(passwords.PASSWORD_RETRY_AFTER)
+    assert passwords.pending_hashes() == 0
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import delete, insert
+
+from models.bus import Bus
+from utils.route_planner import RouteGraph, leg_from_bus, parse_hhmm
+
+
+def graph(*buses):
+    g = RouteGraph()
+    g.add_legs(leg_from_bus({"id": i + 1, "operator": f"Op {i}", **bus}) for i, bus in enumerate(buses))
+    return g
+
+
+def test_cheaper_leg_that_misses_the_connection_does_not_hide_the_dearer_one():
+    g = graph(
+        {"origin": "A", "destination": "B", "departure": "06:00", "arrival": "10:00", "price": 100},
+        {"origin": "A", "destination": "B", "departure": "05:00", "arrival": "08:00", "price": 200},
+        {"origin": "B", "destination": "C", "departure": "09:00", "arrival": "12:00", "price": 50},
+    )
+    itineraries = g.plan("A", "C", k=1)
+    assert len(itineraries) == 1
+    assert itineraries[0]["total_price"] == 250
+    assert [leg["bus_id"] for leg in itineraries[0]["legs"]] == [2, 3]
+
+
+def test_results_are_ranked_by_price_then_arrival():
+    g = graph(
+        {"origin": "A", "destination": "C", "departure": "08:00", "arrival": "12:00", "price": 900},
+        {"origin": "A", "destination": "B", "departure": "06:00", "arrival": "08:00", "price": 100},
+        {"origin": "B", "destination": "C", "departure": "09:00", "arrival": "11:00", "price": 100},
+    )
+    assert [i["total_price"] for i in g.plan("A", "C", k=5)] == [200, 900]
+    assert [i["arrival"] for i in g.plan("A", "C", k=5, rank="arrival")] == ["11:00", "12:00"]
+
+
+def test_parse_hhmm_rejects_out_of_range_times():
+    assert parse_hhmm("9:05") == 545
+    for value in ("24:00", "12:60", "-1:00", "9", "ab:cd"):
+        with pytest.raises(ValueError):
+            parse_hhmm(value)
+
+
+@pytest.mark.anyio
+async def test_search_picks_up_buses_loaded_by_another_process(client):
+    from database.connection import engine
+    from utils.cache import invalidate_inventory
+    params = {"from_city": "Alphaville", "to_city": "Betaville", "depart_after": "06:00"}
+    assert (await client.get("/search", params=params)).json()["itineraries"] == []
+
+    # Written straight to the database, as python -m database.loader would from its own process
+    async with engine.begin() as conn:
+        await conn.execute(insert(Bus), [
+            {"id": 9001, "operator": "Op", "origin": "Alphaville", "destination": "Gammaton",
+             "departure": "07:00", "arrival": "09:00", "price": 300, "image": ""},
+            {"id": 9002, "operator": "Op", "origin": "Gammaton", "destination": "Betaville",
+             "departure": "10:00", "arrival": "12:00", "price": 400, "image": ""},
+        ])
+    # The graph isn't told; only the cache is invalidated, as the loader does through Redis
+    await invalidate_inventory("buses")
+    itineraries = (await client.get("/search", params=params)).json()["itineraries"]
+    assert [leg["bus_id"] for leg in itineraries[0]["legs"]] == [9001, 9002]
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(Bus).where(Bus.id == 9002))
+    await invalidate_inventory("buses")
+    assert (await client.get("/search", params=params)).json()["itineraries"] == []
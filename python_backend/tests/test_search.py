@@ -0,0 +1,9 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("to_city, found", [("Goa", True), ("go", True), ("  GOA ", True), ("oa", False)])
+async def test_to_city_matches_name_prefixes(client, to_city, found):
+    cities = [d["city"] for d in (await client.get("/search", params={"to_city": to_city})).json()["results"]]
+    assert ("Goa" in cities) is found
@@ -0,0 +1,249 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from fastapi.responses import Response
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_TTL = int(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Optional shared backend, e.g. redis://localhost:6379/0
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+
+class CachedBody:
+    __slots__ = ("body", "etag", "expires_at", "generation")
+
+    def __init__(self, body, etag, expires_at, generation=None):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        # Shared-backend generation of the namespace this body was built under
+        self.generation = generation
+
+
+def serialize(content):
+    # Same encoding FastAPI's JSONResponse uses, done once per cache fill
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body):
+    # Strong ETag: byte-identical bodies share it, across processes too
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class LRUCache:
+    """In-process LRU of serialized bodies, bounded by TTL and total body size."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        if len(entry.body) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, namespace):
+        for key in [k for k in self.entries if k[0] == namespace]:
+            self._remove(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.size -= len(entry.body)
+
+
+class RedisBackend:
+    """Shared second-level cache on any client with the redis.asyncio API.
+
+    Each namespace has a generation counter that is part of every key.
+    Invalidation bumps it, which orphans the old keys (they expire with their
+    TTL) and tells every worker that its in-process copies are stale. Tests
+    can pass a stub client instead of a real server.
+    """
+
+    prefix = "travelgo:cache"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, key, generation):
+        return f"{self.prefix}:{key[0]}:{generation}:{key[1]}"
+
+    async def generation(self, namespace):
+        value = await self.client.get(f"{self.prefix}:{namespace}:generation")
+        return int(value) if value is not None else 0
+
+    async def get(self, key, generation):
+        raw = await self.client.get(self._key(key, generation))
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return etag.decode(), body
+
+    async def set(self, key, generation, etag, body, ttl):
+        await self.client.set(self._key(key, generation), etag.encode() + b"\n" + body, ex=ttl)
+
+    async def invalidate(self, namespace):
+        await self.client.incr(f"{self.prefix}:{namespace}:generation")
+
+
+def redis_from_env():
+    if not REDIS_URL:
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logging.warning("REDIS_URL is set but the redis package is not installed; using the in-process cache only.")
+        return None
+    return RedisBackend(redis.from_url(REDIS_URL))
+
+
+class ResponseCache:
+    """Caches pre-serialized JSON bodies per (namespace, query string).
+
+    Responses carry a strong ETag and Cache-Control, and a matching
+    If-None-Match gets an empty 304. Call invalidate(namespace) whenever the
+    data behind a namespace changes. With a shared backend, in-process hits
+    are checked against the namespace's shared generation, so an
+    invalidation in any worker takes effect in all of them. Without one,
+    other processes only drop their copies when the TTL runs out.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, shared=None, enabled=CACHE_ENABLED):
+        self.ttl = ttl
+        self.local = LRUCache(max_bytes)
+        self.shared = shared
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.not_modified = 0
+        self.stale = 0
+
+    def _response(self, request, entry, ttl):
+        headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={ttl}"}
+        if etag_matches(request.headers.get("if-none-match", ""), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    async def respond(self, request, namespace, build, ttl=None):
+        """Serve namespace's cached body for this request's query, calling build() on a miss."""
+        ttl = ttl or self.ttl
+        if not self.enabled:
+            return Response(content=serialize(await build()), media_type="application/json")
+        key = (namespace, str(request.query_params))
+        generation = None
+        if self.shared is not None:
+            try:
+                generation = await self.shared.generation(namespace)
+            except Exception as e:
+                # Without the generation, fall back to TTL-bounded local entries
+                logging.warning(f"Shared cache read failed: {e}")
+        entry = self.local.get(key)
+        if entry is not None:
+            if generation is None or entry.generation == generation:
+                self.hits += 1
+                return self._response(request, entry, ttl)
+            # Invalidated by another worker since this copy was made
+            self.stale += 1
+        if generation is not None:
+            try:
+                found = await self.shared.get(key, generation)
+            except Exception as e:
+                logging.warning(f"Shared cache read failed: {e}")
+                found = None
+            if found is not None:
+                self.shared_hits += 1
+                etag, body = found
+                entry = CachedBody(body, etag, time.monotonic() + ttl, generation)
+                self.local.set(key, entry)
+                return self._response(request, entry, ttl)
+        self.misses += 1
+        body = serialize(await build())
+        entry = CachedBody(body, make_etag(body), time.monotonic() + ttl, generation)
+        self.local.set(key, entry)
+        if generation is not None:
+            try:
+                # Filed under the generation read before building, so a body built from
+                # data that was invalidated meanwhile is never served as current
+                await self.shared.set(key, generation, entry.etag, body, ttl)
+            except Exception as e:
+                logging.warning(f"Shared cache write failed: {e}")
+        return self._response(request, entry, ttl)
+
+    async def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.local.invalidate(namespace)
+            if self.shared is not None:
+                try:
+                    await self.shared.invalidate(namespace)
+                except Exception as e:
+                    # The data change has already committed; other workers catch up within the TTL
+                    logging.warning(f"Shared cache invalidation failed: {e}")
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "stale": self.stale,
+            "evictions": self.local.evictions,
+            "entries": len(self.local.entries),
+            "bytes": self.local.size,
+        }
+
+
+response_cache = ResponseCache(shared=redis_from_env())
+
+# Which cached namespaces each inventory table feeds
+INVENTORY_NAMESPACES = {
+    "destinations": ("search",),
+    # /search bundles itineraries from buses with the cheapest hotel
+    "hotels": ("hotels", "search"),
+    "buses": ("buses", "search"),
+}
+
+
+async def invalidate_inventory(*tables):
+    """Hook for anything that changes inventory rows."""
+    for table in tables:
+        await response_cache.invalidate(*INVENTORY_NAMESPACES.get(table, ()))
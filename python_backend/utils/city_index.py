@@ -0,0 +1,170 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import csv
+import os
+import re
+import unicodedata
+from utils.indian_cities import INDIAN_CITIES, CITY_ALIASES
+
+# Optional CSV with columns: name, popularity (lower = more popular), aliases ("|"-separated)
+CITY_DATA_FILE = os.getenv("CITY_DATA_FILE", "")
+MAX_SUGGESTIONS = 8
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    # "Pimpri-Chinchwad" / "pimpri chinchwad" / "Pimprí" all become "pimprichinchwad"
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _NON_ALNUM.sub("", text.lower())
+
+
+def max_typos(query):
+    # Bounded edit distance: none for short queries (too noisy), 2 for long ones
+    if len(query) < 4:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}
+        # Best (tier, popularity, city_id) entries in this subtree, at most MAX_SUGGESTIONS
+        self.top = []
+
+
+class CityIndex:
+    """Deduplicated prefix trie over city names, word tokens and aliases.
+
+    Every node keeps its subtree's best entries, so a prefix lookup is a walk of
+    len(query) nodes. Typo-tolerant matches are a bounded Levenshtein walk over
+    the same trie and are only tried when nothing matches the query as a prefix.
+    """
+
+    def __init__(self, cities, aliases=None, limit=MAX_SUGGESTIONS):
+        """cities: iterable of (name, popularity); aliases: {alias: canonical name}."""
+        self.limit = limit
+        self.names = []
+        self.popularity = []
+        self.root = _Node()
+        ids = {}
+        for name, popularity in cities:
+            key = normalize(name)
+            if not key or key in ids:
+                continue
+            ids[key] = len(self.names)
+            self.names.append(name)
+            self.popularity.append(popularity)
+
+        for city_id, name in enumerate(self.names):
+            popularity = self.popularity[city_id]
+            self._insert(normalize(name), (0, popularity, city_id))
+            # Later words, e.g. "gaya" for "Bodh Gaya", rank below full-name prefixes
+            words = [normalize(w) for w in re.split(r"[\s\-]+", name)]
+            for word in words[1:]:
+                self._insert(word, (1, popularity, city_id))
+        for alias, canonical in (aliases or {}).items():
+            city_id = ids.get(normalize(canonical))
+            if city_id is not None:
+                self._insert(normalize(alias), (1, self.popularity[city_id], city_id))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _insert(self, key, entry):
+        node = self.root
+        self._offer(node, entry)
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            self._offer(node, entry)
+
+    def _offer(self, node, entry):
+        top = node.top
+        for i, existing in enumerate(top):
+            if existing[2] == entry[2]:
+                if existing <= entry:
+                    return
+                del top[i]
+                break
+        if len(top) >= self.limit and entry >= top[-1]:
+            return
+        top.append(entry)
+        top.sort()
+        del top[self.limit:]
+
+    def _prefix(self, key):
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.top
+
+    def _fuzzy(self, key, max_dist):
+        """Return {city_id: (distance, popularity)} for keys within max_dist of a prefix.
+
+        The first letter must match: typos there are rare, and anchoring it keeps
+        the walk to one branch of the trie.
+        """
+        found = {}
+        start = self.root.children.get(key[0])
+        if start is None:
+            return found
+        # DP row after matching key[0] against the start node
+        first_row = [1] + list(range(len(key)))
+        stack = [(child, ch, first_row) for ch, child in start.children.items()]
+        while stack:
+            node, ch, prev = stack.pop()
+            row = [prev[0] + 1]
+            for i, qch in enumerate(key, 1):
+                row.append(min(row[i - 1] + 1, prev[i] + 1, prev[i - 1] + (qch != ch)))
+            dist = row[-1]
+            if dist <= max_dist:
+                # node.top already covers the whole subtree, no need to go deeper
+                for _, popularity, city_id in node.top:
+                    best = found.get(city_id)
+                    if best is None or dist < best[0]:
+                        found[city_id] = (dist, popularity)
+            elif min(row) <= max_dist:
+                stack.extend((child, c, row) for c, child in node.children.items())
+        return found
+
+    def suggest(self, query, limit=None):
+        limit = limit or self.limit
+        key = normalize(query)
+        if not key:
+            return []
+        results = [city_id for _, _, city_id in self._prefix(key)][:limit]
+        max_dist = max_typos(key)
+        if not results and max_dist:
+            fuzzy = self._fuzzy(key, max_dist)
+            results = [city_id for _, city_id in sorted((v, c) for c, v in fuzzy.items())][:limit]
+        return [self.names[city_id] for city_id in results]
+
+
+def load_city_file(path):
+    cities, aliases = [], {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for rank, row in enumerate(csv.DictReader(f)):
+            name = row["name"].strip()
+            popularity = int(row.get("popularity") or rank)
+            cities.append((name, popularity))
+            for alias in (row.get("aliases") or "").split("|"):
+                if alias.strip():
+                    aliases[alias.strip()] = name
+    return cities, aliases
+
+
+def build_city_index(path=CITY_DATA_FILE):
+    # INDIAN_CITIES is ordered roughly by size, so list position doubles as popularity
+    cities = [(name, rank) for rank, name in enumerate(INDIAN_CITIES)]
+    aliases = dict(CITY_ALIASES)
+    if path:
+        extra_cities, extra_aliases = load_city_file(path)
+        offset = len(cities)
+        cities.extend((name, offset + popularity) for name, popularity in extra_cities)
+        aliases.update(extra_aliases)
+    return CityIndex(cities, aliases)
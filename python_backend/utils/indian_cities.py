@@ -14,3 +14,24 @@ INDIAN_CITIES = [
     "Jammu", "Srinagar", "Itanagar", "Dispur", "Imphal", "Shillong",
     "Aizawl", "Kohima", "Agartala", "Gangtok"
 ]
+
+# Alternate and historical spellings, mapped to the name used in INDIAN_CITIES
+CITY_ALIASES = {
+    "Bengaluru": "Bangalore",
+    "Bombay": "Mumbai",
+    "Madras": "Chennai",
+    "Calcutta": "Kolkata",
+    "Prayagraj": "Allahabad",
+    "New Delhi": "Delhi",
+    "Mysuru": "Mysore",
+    "Vizag": "Visakhapatnam",
+    "Trichy": "Tiruchirappalli",
+    "Benares": "Varanasi",
+    "Kashi": "Varanasi",
+    "Baroda": "Vadodara",
+    "Poona": "Pune",
+    "Udhagamandalam": "Ooty",
+    "Panjim": "Panaji",
+    "Gauhati": "Guwahati",
+    "Simla": "Shimla",
+}
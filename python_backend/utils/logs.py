@@ -0,0 +1,56 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import json
+import logging
+import os
+import random
+import time
+from utils.metrics import registry, Counter
+
+# Share of routine (INFO) events that get logged at all
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+# Hard ceiling on emitted events per second, whatever the traffic
+LOG_MAX_PER_SEC = float(os.getenv("LOG_MAX_PER_SEC", "50"))
+
+logger = logging.getLogger("travelgo")
+
+log_events_dropped = registry.register(Counter(
+    "travelgo_log_events_dropped_total", "Log events skipped by sampling or the rate cap.", ("reason",)))
+
+_tokens = LOG_MAX_PER_SEC
+_updated = time.monotonic()
+
+
+def _take_token():
+    global _tokens, _updated
+    now = time.monotonic()
+    _tokens = min(LOG_MAX_PER_SEC, _tokens + (now - _updated) * LOG_MAX_PER_SEC)
+    _updated = now
+    if _tokens < 1:
+        return False
+    _tokens -= 1
+    return True
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """Emit one structured (JSON) log line, sampled and rate-capped.
+
+    INFO events are kept with probability LOG_SAMPLE_RATE; warnings and
+    errors are always candidates. Everything passes a token bucket so log
+    volume stays bounded under any load. Fields are only serialized for
+    events that are actually written, and must not carry personal data.
+    """
+    sampled = level < logging.WARNING
+    if sampled and random.random() >= LOG_SAMPLE_RATE:
+        log_events_dropped.inc("sampled")
+        return
+    if not _take_token():
+        log_events_dropped.inc("rate_limited")
+        return
+    if not logger.isEnabledFor(level):
+        return
+    record = {"event": event, **fields}
+    if sampled:
+        record["sample_rate"] = LOG_SAMPLE_RATE
+    logger.log(level, json.dumps(record, default=str, separators=(",", ":")))
@@ -0,0 +1,269 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from bisect import bisect_left
+from sqlalchemy import event
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+# A loop stalled this long gets the blocking call's stack logged
+LOOP_STALL_MS = float(os.getenv("LOOP_STALL_MS", "250"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("travelgo.metrics")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, *label_values):
+        self.values[label_values] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition format."""
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self.values = {}
+
+    def observe(self, value, *label_values):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for label_values, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, label_values + (bound,))} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        # Collectors refresh gauges whose values live elsewhere (cache, batch writer, ...)
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "travelgo_http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")))
+http_latency = registry.register(Histogram(
+    "travelgo_http_request_duration_seconds", "HTTP request latency by route.", ("route", "method")))
+db_queries = registry.register(Histogram(
+    "travelgo_db_query_duration_seconds", "SQL statement execution time.", ("operation",)))
+db_slow_queries = registry.register(Counter(
+    "travelgo_db_slow_queries_total", "SQL statements slower than DB_SLOW_QUERY_MS.", ("operation",)))
+db_query_errors = registry.register(Counter(
+    "travelgo_db_query_errors_total", "SQL statements that raised (constraint violations, timeouts, ...).",
+    ("operation",)))
+loop_lag = registry.register(Histogram(
+    "travelgo_event_loop_lag_seconds", "Delay between a scheduled loop wake-up and when it ran."))
+loop_stalls = registry.register(Counter(
+    "travelgo_event_loop_stalls_total", "Times the event loop was blocked longer than LOOP_STALL_MS."))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status per route template.
+
+    Routes are labelled by their path template (/hotels, /static) rather
+    than the raw URL so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None)
+            if path is None:
+                # Mounted apps (StaticFiles) only leave their mount point behind
+                mount = scope.get("root_path", "")
+                path = mount if mount != root_path else "unmatched"
+            method = scope["method"]
+            http_latency.observe(time.perf_counter() - start, path, method)
+            http_requests.inc(path, method, str(status))
+
+
+def _operation(statement):
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+
+
+_instrumented = weakref.WeakSet()
+
+
+def instrument_engine(engine):
+    """Time every statement on engine and log the slow ones."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine in _instrumented:
+        return
+    _instrumented.add(sync_engine)
+
+    # The start time lives on the execution context, which is dropped with the statement
+    # whether or not it succeeds (after_cursor_execute never runs for a failed one)
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        operation = _operation(statement)
+        db_queries.observe(elapsed, operation)
+        if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+            db_slow_queries.inc(operation)
+            # Statement text only; parameters may hold user data
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement[:500]}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.statement is not None:
+            db_query_errors.inc(_operation(exception_context.statement))
+
+
+class LoopMonitor:
+    """Measures event-loop lag and catches calls that block the loop.
+
+    A coroutine sleeps for LOOP_LAG_INTERVAL and records how late it wakes
+    up. A watchdog thread checks the same heartbeat; if the loop has not
+    ticked for LOOP_STALL_MS it logs the loop thread's current stack, which
+    points straight at the blocking call (e.g. bcrypt in an async handler).
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, stall_ms=LOOP_STALL_MS):
+        self.interval = interval
+        self.stall = stall_ms / 1000
+        self.heartbeat = time.monotonic()
+        self.max_lag = 0.0
+        self.task = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.loop_thread_id = None
+
+    def start(self):
+        if self.task is not None:
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopping.clear()
+        self.task = asyncio.create_task(self._tick())
+        self.thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.stopping.set()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.heartbeat = now
+            self.max_lag = max(self.max_lag, lag)
+            loop_lag.observe(lag)
+
+    def _watch(self):
+        reported = None
+        while not self.stopping.wait(self.stall / 2):
+            beat = self.heartbeat
+            if time.monotonic() - beat < self.stall + self.interval:
+                continue
+            # One report per stall
+            if reported == beat:
+                continue
+            reported = beat
+            loop_stalls.inc()
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logger.warning(f"Event loop blocked for over {self.stall * 1000:.0f} ms; loop thread stack:\n{stack}")
@@ -0,0 +1,83 @@
+import base64
+import json
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+def encode_cursor(value, row_id):
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        return value, row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def check_value(column, value):
+    """Return value if it fits column's type, converting ISO strings for date columns.
+
+    Cursor values are bound straight into SQL, so a list, object or wrongly
+    typed value must not get that far.
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if isinstance(value, bool):
+        raise TypeError("bool is not a valid cursor value")
+    if python_type is int or python_type is float:
+        if not isinstance(value, (int, float)) or (python_type is int and not isinstance(value, int)):
+            raise TypeError(f"expected {python_type.__name__}")
+        return value
+    if hasattr(python_type, "fromisoformat"):
+        return python_type.fromisoformat(value)
+    if python_type is str and not isinstance(value, str):
+        raise TypeError("expected str")
+    if not isinstance(value, (str, int, float)):
+        raise TypeError("cursor values must be scalars")
+    return value
+
+
+def keyset_page(stmt, sort_column, id_column, cursor=None, descending=False, limit=DEFAULT_PAGE_SIZE):
+    """Order stmt by (sort_column, id) and start after the cursor row.
+
+    Fetches one extra row so the caller can tell whether there is a next page.
+    Both halves of the cursor are checked against their column's type.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        try:
+            value = check_value(sort_column, value)
+            row_id = check_value(id_column, row_id)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+        key = tuple_(sort_column, id_column)
+        stmt = stmt.where(key < tuple_(value, row_id) if descending else key > tuple_(value, row_id))
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column, id_column)
+    return stmt.limit(limit + 1)
+
+
+def page_result(rows, sort_attr, limit):
+    """Trim the look-ahead row and build the next cursor, if any."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_attr), last.id)
+    return rows, next_cursor
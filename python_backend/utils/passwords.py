@@ -0,0 +1,97 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from passlib.hash import bcrypt
+
+# Password hashing settings
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(os.cpu_count() or 1)))
+# Max hash/verify jobs running or waiting before new ones are rejected
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", str(PASSWORD_WORKERS * 4)))
+PASSWORD_RETRY_AFTER = int(os.getenv("PASSWORD_RETRY_AFTER", "1"))
+# Workers are started from a clean process rather than forked from the server, which
+# already runs threads (aiosqlite, loop watchdog) that fork could leave holding locks
+PASSWORD_START_METHOD = os.getenv(
+    "PASSWORD_START_METHOD", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+hasher = bcrypt.using(rounds=BCRYPT_ROUNDS)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password worker queue is full."""
+
+
+# These run inside the worker processes, so they must stay module-level.
+def _hash(password):
+    return hasher.hash(password)
+
+
+def _warm_up():
+    # Loads the bcrypt backend so the first real job doesn't pay for it either
+    bcrypt.get_backend()
+    return os.getpid()
+
+
+def _verify(password, hashed_password):
+    """Return (matches, new_hash); new_hash is set when the stored cost is outdated."""
+    if not bcrypt.verify(password, hashed_password):
+        return False, None
+    if hasher.needs_update(hashed_password):
+        return True, hasher.hash(password)
+    return True, None
+
+
+_executor = None
+_pending = 0
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_WORKERS, mp_context=multiprocessing.get_context(PASSWORD_START_METHOD))
+    return _executor
+
+
+async def start_pool():
+    """Start every worker process now, so the first logins don't wait for them."""
+    loop = asyncio.get_running_loop()
+    executor = _pool()
+    await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(PASSWORD_WORKERS)))
+    return executor
+
+
+def shutdown_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _submit(func, *args):
+    global _pending
+    # Admission control: fail fast instead of letting logins pile up
+    if _pending >= PASSWORD_QUEUE_SIZE:
+        raise PasswordPoolBusy()
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_pool(), func, *args)
+    finally:
+        _pending -= 1
+
+
+def pending_hashes():
+    return _pending
+
+
+async def hash_password(password):
+    return await _submit(_hash, password)
+
+
+async def verify_password(password, hashed_password):
+    return await _submit(_verify, password, hashed_password)
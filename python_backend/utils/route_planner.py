@@ -0,0 +1,233 @@
+import heapq
+from functools import lru_cache
+from bisect import bisect_left
+from collections import namedtuple
+from utils.city_index import normalize
+
+DAY = 24 * 60
+DEFAULT_MAX_LEGS = 3
+# Allowed wait between arriving and the next departure, in minutes
+MIN_TRANSFER = 30
+MAX_TRANSFER = 6 * 60
+
+# dep is minutes after midnight; the timetable repeats daily
+Leg = namedtuple("Leg", "id origin_key dest_key origin destination dep duration price operator")
+
+
+def parse_hhmm(value):
+    hours, minutes = (int(part) for part in value.split(":"))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time of day: {value!r}")
+    return hours * 60 + minutes
+
+
+def format_hhmm(minutes):
+    minutes %= DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# City names repeat across thousands of legs, so memoise their keys
+city_key = lru_cache(maxsize=None)(normalize)
+
+
+def leg_from_bus(bus):
+    """Build a Leg from a Bus row or an equivalent dict; None if it has no origin."""
+    get = bus.get if isinstance(bus, dict) else lambda k: getattr(bus, k)
+    if not get("origin"):
+        return None
+    dep = parse_hhmm(get("departure"))
+    duration = (parse_hhmm(get("arrival")) - dep) % DAY or DAY
+    return Leg(get("id"), city_key(get("origin")), city_key(get("destination")), get("origin"),
+               get("destination"), dep, duration, get("price"), get("operator"))
+
+
+class RouteGraph:
+    """Timetable graph of bus legs between cities.
+
+    Departures from each city are kept sorted by time of day so the legs
+    inside a transfer window are found with bisect. For every city pair
+    the cheapest price and shortest duration are precomputed; plan() uses
+    them as A* lower bounds. Legs can be added and removed incrementally
+    as inventory changes.
+    """
+
+    def __init__(self, cities=()):
+        self.names = {normalize(c): c for c in cities}
+        self.legs = {}
+        self.departures = {}
+        # incoming[dest][origin] -> {leg_id: (price, duration)}
+        self.incoming = {}
+        self._next_id = -1
+        self._bounds_cache = {}
+
+    def __len__(self):
+        return len(self.legs)
+
+    def add_legs(self, legs):
+        touched = set()
+        for leg in legs:
+            if leg is None:
+                continue
+            if leg.id is None:
+                # Rows loaded without a primary key still need a unique handle
+                leg = leg._replace(id=self._next_id)
+                self._next_id -= 1
+            if leg.id in self.legs:
+                self.remove_legs([leg.id])
+            self.legs[leg.id] = leg
+            self.names.setdefault(leg.origin_key, leg.origin)
+            self.names.setdefault(leg.dest_key, leg.destination)
+            self.departures.setdefault(leg.origin_key, []).append((leg.dep, leg.id))
+            touched.add(leg.origin_key)
+            pair = self.incoming.setdefault(leg.dest_key, {}).setdefault(leg.origin_key, {})
+            pair[leg.id] = (leg.price, leg.duration)
+        for city in touched:
+            self.departures[city].sort()
+        self._bounds_cache.clear()
+
+    def remove_legs(self, leg_ids):
+        for leg_id in leg_ids:
+            leg = self.legs.pop(leg_id, None)
+            if leg is None:
+                continue
+            departures = self.departures[leg.origin_key]
+            departures.pop(bisect_left(departures, (leg.dep, leg.id)))
+            pair = self.incoming[leg.dest_key][leg.origin_key]
+            del pair[leg.id]
+            if not pair:
+                del self.incoming[leg.dest_key][leg.origin_key]
+        self._bounds_cache.clear()
+
+    def clear(self):
+        self.legs.clear()
+        self.departures.clear()
+        self.incoming.clear()
+        self._bounds_cache.clear()
+
+    def _lower_bounds(self, dest, max_legs, rank):
+        """bounds[r][city]: least price (or minutes) from city to dest in at most r legs."""
+        cache_key = (dest, max_legs, rank)
+        cached = self._bounds_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        field = 0 if rank == "price" else 1
+        bounds = [{dest: 0}]
+        frontier = {dest: 0}
+        for _ in range(max_legs - 1):
+            current = dict(bounds[-1])
+            improved = {}
+            for city, cost in frontier.items():
+                for origin, legs in self.incoming.get(city, {}).items():
+                    value = cost + min(v[field] for v in legs.values())
+                    if value < current.get(origin, float("inf")):
+                        current[origin] = value
+                        improved[origin] = value
+            bounds.append(current)
+            frontier = improved
+        if len(self._bounds_cache) > 1024:
+            self._bounds_cache.clear()
+        self._bounds_cache[cache_key] = bounds
+        return bounds
+
+    def _departures_between(self, city, start, end):
+        """Yield (absolute departure minute, leg) for legs leaving city in [start, end)."""
+        departures = self.departures.get(city)
+        if not departures:
+            return
+        day = start // DAY
+        while day * DAY < end:
+            low = max(start - day * DAY, 0)
+            high = min(end - day * DAY, DAY)
+            i = bisect_left(departures, (low,))
+            while i < len(departures) and departures[i][0] < high:
+                dep, leg_id = departures[i]
+                yield day * DAY + dep, self.legs[leg_id]
+                i += 1
+            day += 1
+
+    def plan(self, origin, destination, depart_after=0, k=5, rank="price", max_legs=DEFAULT_MAX_LEGS,
+             min_transfer=MIN_TRANSFER, max_transfer=MAX_TRANSFER):
+        """Top-k itineraries from origin to destination, best first.
+
+        rank="price" minimises total fare, rank="arrival" the arrival time.
+        Itineraries leave within 24 hours of depart_after (minutes after
+        midnight, day 0) and wait between min_transfer and max_transfer
+        minutes at each connection. No city is visited twice.
+        """
+        start, goal = normalize(origin), normalize(destination)
+        if start == goal or start not in self.departures or goal not in self.incoming:
+            return []
+        by_price = rank == "price"
+        bounds = self._lower_bounds(goal, max_legs, "price" if by_price else "arrival")
+
+        # Heap entries: (priority, seq, price, arrival, city, legs as ((abs_dep, leg), ...))
+        heap = []
+        seq = 0
+        results = []
+        popped = {}
+
+        def push(price, dep, leg, path):
+            nonlocal seq
+            arrival = dep + leg.duration
+            remaining = max_legs - len(path) - 1
+            if leg.dest_key == goal:
+                priority = price if by_price else arrival
+            else:
+                if remaining <= 0 or any(p.origin_key == leg.dest_key for _, p in path):
+                    return
+                bound = bounds[remaining].get(leg.dest_key)
+                if bound is None:
+                    return
+                priority = price + bound if by_price else arrival + bound
+            seq += 1
+            heapq.heappush(heap, ((priority, arrival if by_price else price), seq, price, arrival,
+                                  leg.dest_key, path + ((dep, leg),)))
+
+        for dep, leg in self._departures_between(start, depart_after, depart_after + DAY):
+            push(leg.price, dep, leg, ())
+
+        while heap and len(results) < k:
+            _, _, price, arrival, city, path = heapq.heappop(heap)
+            if city == goal:
+                results.append(self._itinerary(path, price))
+                continue
+            # k-shortest-paths pruning over the full search state. Partial paths that reach
+            # the same city at the same time having visited the same cities have identical
+            # continuations, so only the k best of them can lead to a top-k itinerary.
+            # Keying on the city alone is not enough: a cheaper path can arrive too late
+            # (or too early) for the transfer window that a dearer one catches.
+            state = (city, arrival, frozenset(leg.origin_key for _, leg in path))
+            count = popped.get(state, 0)
+            if count >= k:
+                continue
+            popped[state] = count + 1
+            for dep, leg in self._departures_between(city, arrival + min_transfer, arrival + max_transfer + 1):
+                push(price + leg.price, dep, leg, path)
+        return results
+
+    def _itinerary(self, path, price):
+        legs = []
+        for dep, leg in path:
+            legs.append({
+                # Synthetic (negative) ids mean the row was loaded without its database id
+                "bus_id": leg.id if leg.id > 0 else None,
+                "operator": leg.operator,
+                "origin": leg.origin,
+                "destination": leg.destination,
+                "departure": format_hhmm(dep),
+                "arrival": format_hhmm(dep + leg.duration),
+                "day": dep // DAY,
+                "price": leg.price,
+            })
+        first_dep = path[0][0]
+        last_dep, last_leg = path[-1]
+        arrival = last_dep + last_leg.duration
+        return {
+            "legs": legs,
+            "transfers": len(path) - 1,
+            "total_price": price,
+            "departure": format_hhmm(first_dep),
+            "arrival": format_hhmm(arrival),
+            "arrival_day": arrival // DAY,
+            "duration_minutes": arrival - first_dep,
+        }
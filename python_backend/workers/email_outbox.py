@@ -0,0 +1,335 @@
+"""Delivers queued emails from the email_outbox table.
+
+Run as its own process, from python_backend/:
+    python -m workers.email_outbox
+
+Rows are claimed in batches with a lease (next_attempt_at is pushed forward),
+so several workers can run side by side and a crashed worker's rows come
+back after OUTBOX_LEASE_SECONDS. A claim bumps attempts, which doubles as a
+fencing token: results are only written back while the row is still at the
+count this worker claimed it with. Failures back off exponentially, and rows
+that fail OUTBOX_MAX_ATTEMPTS times are marked dead.
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import logging
+import os
+import queue
+import random
+import smtplib
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from sqlalchemy import select, update, func
+from database.connection import engine as default_engine, init_db
+from models.email_outbox import EmailOutbox, PENDING, SENT, DEAD
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USERNAME or "no-reply@travelgo.local")
+# STARTTLS is used whenever the server offers it, unless disabled
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+SMTP_CONNECTIONS = int(os.getenv("SMTP_CONNECTIONS", "2"))
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "2"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+# Max emails per second across this worker's connections (0 = unlimited)
+OUTBOX_RATE_LIMIT = float(os.getenv("OUTBOX_RATE_LIMIT", "20"))
+OUTBOX_STATS_INTERVAL = float(os.getenv("OUTBOX_STATS_INTERVAL", "30"))
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value):
+    # SQLite hands back naive datetimes; everything we store is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def backoff_delay(attempts):
+    # Exponential backoff with jitter: ~2s, 4s, 8s, ... for the default base
+    return OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+def is_permanent(error):
+    # 5xx replies (bad mailbox, rejected content) won't succeed on retry
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class SMTPPool:
+    """A few long-lived SMTP connections shared by the sender threads.
+
+    Connections are opened lazily and reopened once if the server has
+    dropped them while idle. A rejected message (4xx/5xx reply) doesn't
+    cost the connection; only disconnects and socket errors do.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, username=SMTP_USERNAME,
+                 password=SMTP_PASSWORD, starttls=SMTP_STARTTLS, size=SMTP_CONNECTIONS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = size
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(None)
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=30)
+        conn.ehlo()
+        if self.starttls and conn.has_extn("starttls"):
+            conn.starttls()
+            conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        return conn
+
+    def send(self, message):
+        conn = self.idle.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            try:
+                conn.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                conn = self._connect()
+                conn.send_message(message)
+        except smtplib.SMTPException as e:
+            # Only a lost session is thrown away; after a 4xx/5xx reply it is still good to reuse
+            if conn is None or isinstance(e, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+                self._close(conn)
+                conn = None
+            else:
+                conn = self._reset(conn)
+            raise
+        except Exception:
+            # Socket errors and the like leave the connection in an unknown state
+            self._close(conn)
+            conn = None
+            raise
+        finally:
+            self.idle.put(conn)
+
+    def _reset(self, conn):
+        # Clear the failed transaction so the next message starts clean
+        try:
+            conn.rset()
+            return conn
+        except (smtplib.SMTPException, OSError):
+            self._close(conn)
+            return None
+
+    def _close(self, conn):
+        if conn is not None:
+            try:
+                conn.quit()
+            except Exception:
+                pass
+
+    def close(self):
+        for _ in range(self.size):
+            self._close(self.idle.get())
+        for _ in range(self.size):
+            self.idle.put(None)
+
+
+class RateLimiter:
+    """Token bucket shared by all sends of one worker."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OutboxWorker:
+    def __init__(self, bind=None, smtp=None, batch_size=OUTBOX_BATCH_SIZE, rate_limit=OUTBOX_RATE_LIMIT,
+                 poll_interval=OUTBOX_POLL_INTERVAL, max_attempts=OUTBOX_MAX_ATTEMPTS, sender=SMTP_FROM):
+        self.bind = bind or default_engine
+        self.smtp = smtp or SMTPPool()
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(rate_limit)
+        # One in-flight send per SMTP connection
+        self.slots = asyncio.Semaphore(self.smtp.size)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.sender = sender
+        self.started = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+        self.dead = 0
+        self.batches = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+
+    async def claim(self):
+        """Lease up to batch_size due rows to this worker."""
+        now = utcnow()
+        async with self.bind.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                # FOR UPDATE is ignored on SQLite; take the write lock before reading so
+                # concurrent claimers queue up instead of all leasing the same rows
+                await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            stmt = (
+                select(EmailOutbox)
+                .where(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = (await conn.execute(stmt)).all()
+            if rows:
+                await conn.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_([r.id for r in rows]))
+                    .values(attempts=EmailOutbox.attempts + 1,
+                            next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+                )
+        return rows
+
+    def _message(self, row):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = row.recipient
+        message["Subject"] = row.subject
+        message.set_content(row.body)
+        return message
+
+    async def _deliver(self, row):
+        async with self.slots:
+            await self.limiter.acquire()
+            try:
+                await asyncio.to_thread(self.smtp.send, self._message(row))
+            except Exception as e:
+                return row, e
+        return row, None
+
+    async def run_once(self):
+        """Claim and deliver one batch; returns how many rows were claimed."""
+        rows = await self.claim()
+        if not rows:
+            return 0
+        results = await asyncio.gather(*(self._deliver(row) for row in rows))
+        now = utcnow()
+        # Claimed rows grouped by the attempts value this worker's lease left on them
+        sent_ids = {}
+        lost = 0
+        async with self.bind.begin() as conn:
+            for row, error in results:
+                attempts = row.attempts + 1
+                if error is None:
+                    sent_ids.setdefault(attempts, []).append(row.id)
+                    lag = (now - as_utc(row.created_at)).total_seconds()
+                    self.lag_total += lag
+                    self.lag_max = max(self.lag_max, lag)
+                    continue
+                self.failed += 1
+                if attempts >= self.max_attempts or is_permanent(error):
+                    values = {"status": DEAD, "last_error": str(error)}
+                else:
+                    values = {"next_attempt_at": now + timedelta(seconds=backoff_delay(attempts)),
+                              "last_error": str(error)}
+                result = await conn.execute(update(EmailOutbox).where(
+                    EmailOutbox.id == row.id, EmailOutbox.status == PENDING, EmailOutbox.attempts == attempts
+                ).values(**values))
+                if not result.rowcount:
+                    lost += 1
+                elif values.get("status") == DEAD:
+                    self.dead += 1
+                    logging.error(f"Outbox email {row.id} is dead after {attempts} attempts: {error}")
+            for attempts, ids in sent_ids.items():
+                result = await conn.execute(update(EmailOutbox).where(
+                    EmailOutbox.id.in_(ids), EmailOutbox.status == PENDING, EmailOutbox.attempts == attempts
+                ).values(status=SENT, sent_at=now))
+                lost += len(ids) - result.rowcount
+        if lost:
+            # Our lease ran out mid-batch and another worker reclaimed these rows; its result stands
+            logging.warning(f"Outbox worker lost the lease on {lost} emails before recording them")
+        self.sent += sum(len(ids) for ids in sent_ids.values())
+        self.batches += 1
+        return len(rows)
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            "sent": self.sent,
+            "failed_attempts": self.failed,
+            "dead": self.dead,
+            "batches": self.batches,
+            "sent_per_sec": round(self.sent / elapsed, 2) if elapsed else 0.0,
+            "lag_avg_seconds": round(self.lag_total / self.sent, 3) if self.sent else 0.0,
+            "lag_max_seconds": round(self.lag_max, 3),
+        }
+
+    async def run(self, stop=None):
+        stop = stop or asyncio.Event()
+        last_stats = time.monotonic()
+        try:
+            while not stop.is_set():
+                try:
+                    claimed = await self.run_once()
+                except Exception as e:
+                    logging.error(f"Outbox batch failed: {e}")
+                    claimed = 0
+                if time.monotonic() - last_stats >= OUTBOX_STATS_INTERVAL:
+                    logging.info(f"Outbox worker stats: {self.stats()}")
+                    last_stats = time.monotonic()
+                # Drain back-to-back while there is work, otherwise poll
+                if claimed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await asyncio.to_thread(self.smtp.close)
+
+
+async def outbox_backlog(db):
+    """Pending/dead counts and the age of the oldest pending email, for dashboards."""
+    pending, oldest = (await db.execute(
+        select(func.count(), func.min(EmailOutbox.created_at)).where(EmailOutbox.status == PENDING)
+    )).one()
+    dead = (await db.execute(select(func.count()).where(EmailOutbox.status == DEAD))).scalar()
+    lag = (utcnow() - as_utc(oldest)).total_seconds() if oldest else 0.0
+    return {"pending": pending, "dead": dead, "oldest_pending_seconds": round(lag, 3)}
+
+
+async def main():
+    await init_db()
+    logging.info(f"Outbox worker delivering via {SMTP_HOST}:{SMTP_PORT}")
+    await OutboxWorker().run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass